@@ -0,0 +1,159 @@
+#!/usr/bin/env python3
+"""
+Agent Hook 데몬 클라이언트 shim
+stdin으로 받은 hook 데이터를 Unix 도메인 소켓으로 상주 데몬(hook_daemon.py)에 전달하고
+데몬의 응답(stdout/stderr/종료 코드)을 그대로 돌려줍니다.
+데몬이 실행 중이 아니면 자동으로 시작하며, 시작에 실패하면 기존 스크립트를 직접 실행합니다.
+
+사용법: hook_client.py <event>
+  event: plan-to-issue | todo-to-project | update-index | shutdown
+"""
+
+import os
+import sys
+import json
+import stat
+import time
+import socket
+import struct
+import subprocess
+
+SCRIPT_DIR = os.path.dirname(os.path.realpath(__file__))
+
+# --- 설정 ---
+# 요청에 환경 변수(GITHUB_TOKEN 등)가 포함되므로 소켓과 시작 잠금 파일은 사용자 전용(0700) 디렉토리에 둡니다.
+SOCKET_PATH = os.environ.get('AGENT_HOOK_SOCKET') or os.path.join(
+    os.environ.get('XDG_RUNTIME_DIR') or os.environ.get('TMPDIR') or '/tmp',
+    f"agent-hook-{os.getuid()}", "hook.sock"
+)
+SOCKET_DIR = os.path.dirname(SOCKET_PATH)
+DAEMON_START_TIMEOUT = 5  # 데몬 자동 시작 대기 시간 (초)
+RESPONSE_TIMEOUT = 300    # 데몬 응답 대기 시간 (초)
+# 이벤트별 응답 대기 시간 (None: 제한 없음)
+# update-index는 실행 잠금 대기(RUN_LOCK_WAIT_SECONDS)에 파일 수만큼의 요약 시간이 더해지므로
+# 고정된 상한을 둘 수 없습니다. 스크립트를 직접 실행할 때와 마찬가지로 끝날 때까지 기다립니다.
+RESPONSE_TIMEOUTS = {
+    'update-index': None,
+}
+# 데몬을 사용할 수 없을 때 직접 실행할 스크립트
+FALLBACK_COMMANDS = {
+    'plan-to-issue': ['bash', os.path.join(SCRIPT_DIR, 'plan-to-issue.sh')],
+    'todo-to-project': ['bash', os.path.join(SCRIPT_DIR, 'todo-to-project.sh')],
+    'update-index': [sys.executable, os.path.join(SCRIPT_DIR, 'update_index_md.py')],
+}
+# --- 설정 끝 ---
+
+def prepare_socket_dir():
+    """소켓 디렉토리를 0700으로 만들고, 현재 사용자만 접근할 수 있는 디렉토리인지 확인합니다."""
+    try:
+        os.mkdir(SOCKET_DIR, 0o700)
+    except FileExistsError:
+        pass
+    except OSError:
+        return False
+    try:
+        st = os.lstat(SOCKET_DIR)
+    except OSError:
+        return False
+    return stat.S_ISDIR(st.st_mode) and st.st_uid == os.getuid() and not st.st_mode & 0o077
+
+def is_own_daemon(sock):
+    """연결된 데몬이 현재 사용자의 프로세스인지 확인합니다. (다른 사용자가 소켓을 선점한 경우 거부)"""
+    if hasattr(socket, 'SO_PEERCRED'):
+        creds = sock.getsockopt(socket.SOL_SOCKET, socket.SO_PEERCRED, struct.calcsize('3i'))
+        return struct.unpack('3i', creds)[1] == os.getuid()
+    try:
+        return os.stat(SOCKET_PATH).st_uid == os.getuid()
+    except OSError:
+        return False
+
+def connect(timeout=0):
+    """데몬 소켓에 연결합니다. timeout 동안 재시도하며, 실패 시 None을 반환합니다."""
+    deadline = time.monotonic() + timeout
+    while True:
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        try:
+            sock.connect(SOCKET_PATH)
+            return sock
+        except OSError:
+            sock.close()
+            if time.monotonic() >= deadline:
+                return None
+            time.sleep(0.02)
+
+def start_daemon():
+    """데몬을 백그라운드 세션으로 실행합니다."""
+    subprocess.Popen(
+        [sys.executable, os.path.join(SCRIPT_DIR, 'hook_daemon.py')],
+        stdin=subprocess.DEVNULL, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+        start_new_session=True, close_fds=True
+    )
+
+def send_request(sock, event, payload):
+    """요청을 전송하고 데몬의 응답을 반환합니다."""
+    # 데몬은 여러 클라이언트가 공유하므로 환경 변수를 요청마다 함께 보냅니다.
+    request = json.dumps({"event": event, "cwd": os.getcwd(), "env": dict(os.environ), "payload": payload})
+    sock.settimeout(RESPONSE_TIMEOUTS.get(event, RESPONSE_TIMEOUT))
+    sock.sendall(request.encode('utf-8'))
+    sock.shutdown(socket.SHUT_WR)
+
+    chunks = []
+    while True:
+        chunk = sock.recv(65536)
+        if not chunk:
+            break
+        chunks.append(chunk)
+    return json.loads(b''.join(chunks).decode('utf-8'))
+
+def run_fallback(event, payload):
+    """데몬 없이 기존 hook 스크립트를 직접 실행합니다."""
+    command = FALLBACK_COMMANDS.get(event)
+    if command is None:
+        print(f"데몬을 사용할 수 없습니다: {event}", file=sys.stderr)
+        return 1
+    return subprocess.run(command, input=payload, text=True).returncode
+
+def main():
+    if len(sys.argv) != 2:
+        print(__doc__.strip(), file=sys.stderr)
+        sys.exit(2)
+
+    event = sys.argv[1]
+    payload = '' if event == 'shutdown' or sys.stdin.isatty() else sys.stdin.read()
+
+    if not prepare_socket_dir():
+        print(f"소켓 디렉토리를 안전하게 사용할 수 없습니다 ({SOCKET_DIR}). 스크립트를 직접 실행합니다.",
+              file=sys.stderr)
+        sys.exit(0 if event == 'shutdown' else run_fallback(event, payload))
+
+    sock = connect()
+    if sock is None:
+        if event == 'shutdown':
+            sys.exit(0)
+        start_daemon()
+        sock = connect(DAEMON_START_TIMEOUT)
+    if sock is None:
+        print("데몬 시작 실패. 스크립트를 직접 실행합니다.", file=sys.stderr)
+        sys.exit(run_fallback(event, payload))
+    if not is_own_daemon(sock):
+        # 환경 변수가 다른 사용자에게 전달되지 않도록 요청을 보내지 않습니다.
+        sock.close()
+        print(f"다른 사용자의 프로세스가 소켓을 사용 중입니다 ({SOCKET_PATH}). 스크립트를 직접 실행합니다.",
+              file=sys.stderr)
+        sys.exit(0 if event == 'shutdown' else run_fallback(event, payload))
+
+    try:
+        with sock:
+            response = send_request(sock, event, payload)
+    except (OSError, ValueError) as e:
+        # 요청이 이미 처리되었을 수 있으므로 중복 실행하지 않습니다.
+        print(f"데몬 통신 오류: {e}", file=sys.stderr)
+        sys.exit(1)
+
+    sys.stdout.write(response.get('stdout', ''))
+    sys.stderr.write(response.get('stderr', ''))
+    sys.exit(response.get('exit_code', 1))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,463 @@
+#!/usr/bin/env python3
+"""
+Agent Hook 상주 데몬
+.env 설정, GitHub HTTP 연결, 요약 스레드 풀을 메모리에 유지한 채
+Unix 도메인 소켓으로 hook 이벤트를 받아 처리합니다.
+이벤트마다 bash/Python을 새로 띄우고 설정을 다시 읽는 비용을 없애기 위한 선택 기능이며,
+hook_client.py가 필요할 때 자동으로 실행합니다. IDLE_TIMEOUT 동안 요청이 없으면 종료됩니다.
+
+주의: handle_plan_to_issue / handle_todo_to_project는 plan-to-issue.sh / todo-to-project.sh를
+옮긴 것입니다. 데몬을 시작하지 못하면 hook_client.py가 .sh 스크립트를 직접 실행하므로,
+종료 코드와 stdout(tee로 복사되는 로그 줄 + 결과 JSON)이 같도록 한쪽을 수정하면 다른 쪽도 함께
+수정해야 합니다. 알려진 차이는 다음과 같습니다.
+- GITHUB_TOKEN/GITHUB_OWNER/GITHUB_REPO가 없으면 .sh는 bash 오류(unbound variable)로 중단되고,
+  데몬은 실패 JSON을 출력하고 종료 코드 1을 반환합니다.
+- .sh는 JSON 인코딩된 프롬프트 문자열(따옴표, \\n 포함)로 이슈 제목/본문을 만들고,
+  데몬은 디코딩된 프롬프트를 사용합니다.
+"""
+
+import os
+import io
+import re
+import sys
+import json
+import time
+import fcntl
+import signal
+import functools
+import socket
+import threading
+import contextlib
+import http.client
+import socketserver
+from datetime import datetime
+from urllib.parse import urlparse
+from concurrent.futures import ThreadPoolExecutor
+
+SCRIPT_DIR = os.path.dirname(os.path.realpath(__file__))
+ROOT_DIR = os.path.dirname(SCRIPT_DIR)
+sys.path.insert(0, SCRIPT_DIR)
+
+import update_index_md
+from hook_client import SOCKET_PATH, prepare_socket_dir
+
+# --- 설정 ---
+IDLE_TIMEOUT = int(os.environ.get('AGENT_HOOK_IDLE_TIMEOUT', 600))  # 유휴 종료 시간 (초)
+SUMMARY_WORKERS = 4          # index.md 요약 병렬 처리 스레드 수
+GITHUB_TIMEOUT = 15          # GitHub API 타임아웃 (초)
+MAX_REQUEST_SIZE = 4 * 1024 * 1024
+PLAN_KEYWORDS = re.compile(r'plan|계획|todo|task|구현|implementation', re.IGNORECASE)
+ISSUE_LABELS = ["claude-plan", "automated"]
+# --- 설정 끝 ---
+
+class HookConfig:
+    """.env 파일을 캐시하고, 파일이 변경된 경우에만 다시 읽습니다.
+
+    환경 변수는 요청마다 클라이언트가 보낸 값을 사용하므로, 여러 프로젝트의 클라이언트가
+    같은 데몬을 공유해도 GITHUB_TOKEN, LOG_FILE 등이 섞이지 않습니다.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._env_mtime = None
+        self._env_values = {}
+
+    @staticmethod
+    def _mtime(path):
+        try:
+            return os.stat(path).st_mtime_ns
+        except OSError:
+            return None
+
+    def env_for(self, client_env):
+        """클라이언트 환경 변수 위에 .env 값을 덮어쓴 요청별 환경을 반환합니다. (bash의 source와 동일)"""
+        env_path = os.path.join(ROOT_DIR, '.env')
+        with self._lock:
+            mtime = self._mtime(env_path)
+            if mtime != self._env_mtime:
+                self._env_values = load_env_file(env_path)
+                self._env_mtime = mtime
+            env = dict(client_env)
+            env.update(self._env_values)
+            return env
+
+def env_get(env, key, default=''):
+    return env.get(key) or default
+
+def load_env_file(path):
+    """KEY=VALUE 형식의 .env 파일을 읽습니다."""
+    values = {}
+    if not os.path.exists(path):
+        return values
+    with open(path, 'r', encoding='utf-8') as f:
+        for line in f:
+            line = line.strip()
+            if not line or line.startswith('#') or '=' not in line:
+                continue
+            key, value = line.split('=', 1)
+            if key.startswith('export '):
+                key = key[len('export '):]
+            values[key.strip()] = value.strip().strip('"\'')
+    return values
+
+class GitHubSession:
+    """GitHub API용 keep-alive HTTPS 연결을 요청 간에 재사용합니다."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._conn = None
+        self._base_url = None
+        self._reused = False  # 이전 요청에 사용한 keep-alive 연결인지 여부
+
+    def _connection(self, base_url):
+        if self._conn is None or self._base_url != base_url:
+            self.close()
+            parsed = urlparse(base_url)
+            conn_class = http.client.HTTPSConnection if parsed.scheme == 'https' else http.client.HTTPConnection
+            self._conn = conn_class(parsed.netloc, timeout=GITHUB_TIMEOUT)
+            self._base_url = base_url
+            self._reused = False
+        return self._conn
+
+    def close(self):
+        if self._conn is not None:
+            self._conn.close()
+            self._conn = None
+
+    def request(self, method, endpoint, token, base_url, data=None):
+        """API를 호출하고 (상태 코드, JSON 응답)을 반환합니다.
+
+        서버가 닫은 keep-alive 연결(응답을 받기 전 연결 끊김)만 새 연결로 한 번 재시도합니다.
+        타임아웃 등 요청이 서버에 도달했을 수 있는 오류는 재시도하지 않습니다. (이슈 중복 생성 방지)
+        """
+        path = urlparse(base_url).path.rstrip('/') + endpoint
+        headers = {
+            "Authorization": f"token {token}",
+            "Accept": "application/vnd.github.v3+json",
+            "User-Agent": "Claude-Code-Hook/1.0",
+        }
+        body = None
+        if data is not None:
+            body = json.dumps(data, ensure_ascii=False).encode('utf-8')
+            headers["Content-Type"] = "application/json"
+
+        with self._lock:
+            for attempt in range(2):
+                conn = self._connection(base_url)
+                reused = self._reused
+                try:
+                    conn.request(method, path, body=body, headers=headers)
+                    response = conn.getresponse()
+                except (BrokenPipeError, ConnectionResetError):
+                    # RemoteDisconnected 포함: 재사용한 연결이 이미 닫혀 있던 경우에만 재시도
+                    self.close()
+                    if reused and attempt == 0:
+                        continue
+                    raise
+                except (http.client.HTTPException, OSError):
+                    self.close()
+                    raise
+
+                try:
+                    raw = response.read()
+                except (http.client.HTTPException, OSError):
+                    self.close()
+                    raise
+                self._reused = not response.will_close
+                try:
+                    return response.status, json.loads(raw or b'null')
+                except ValueError:
+                    return response.status, None
+
+class HookDaemon:
+    """데몬 전체에서 공유하는 상태(설정, HTTP 연결, 요약 스레드 풀)를 보관합니다."""
+
+    def __init__(self):
+        self.config = HookConfig()
+        self.github = GitHubSession()
+        self.executor = ThreadPoolExecutor(max_workers=SUMMARY_WORKERS)
+        # update_index_md는 작업 디렉토리와 stdout을 사용하므로 한 번에 하나씩 실행합니다.
+        self.index_lock = threading.Lock()
+        self.log_lock = threading.Lock()
+        self.activity_lock = threading.Lock()
+        self.last_activity = time.monotonic()
+        self.active_requests = 0
+
+    def track_request(self, delta):
+        with self.activity_lock:
+            self.active_requests += delta
+            self.last_activity = time.monotonic()
+
+    def is_idle(self):
+        with self.activity_lock:
+            return self.active_requests == 0 and time.monotonic() - self.last_activity >= IDLE_TIMEOUT
+
+    def log(self, message, env=None, output=None):
+        """LOG_FILE에 기록합니다. output 목록이 주어지면 .sh의 tee처럼 응답 stdout에도 복사합니다."""
+        if env is None:
+            env = self.config.env_for(os.environ)
+        log_file = env_get(env, 'LOG_FILE', os.path.join(ROOT_DIR, 'logs', 'github-hooks.log'))
+        line = f"[{datetime.now().strftime('%Y-%m-%d %H:%M:%S')}] {message}\n"
+        if output is not None:
+            output.append(line)
+        with self.log_lock:
+            try:
+                os.makedirs(os.path.dirname(os.path.abspath(log_file)), exist_ok=True)
+                with open(log_file, 'a', encoding='utf-8') as f:
+                    f.write(line)
+            except OSError:
+                pass
+
+    def handle_plan_to_issue(self, payload, cwd, env):
+        """계획 관련 프롬프트를 GitHub Issue로 생성합니다. (plan-to-issue.sh 대응)"""
+        output = []
+        log = functools.partial(self.log, env=env, output=output)
+        log("Plan to Issue Hook 실행 시작")
+        log("Hook data 수신: " + payload.rstrip('\n'))
+        try:
+            prompt = json.loads(payload).get('prompt', '')
+        except (ValueError, AttributeError):
+            prompt = ''
+        if not prompt:
+            log("프롬프트 내용이 없음. Hook 종료.")
+            return 0, ''.join(output), ''
+
+        if not PLAN_KEYWORDS.search(prompt):
+            log("계획 관련 키워드가 없음. Hook 종료.")
+            return 0, ''.join(output), ''
+
+        log("계획 관련 프롬프트 감지됨")
+        title = prompt.split('\n', 1)[0].lstrip('#* ')[:50]
+        if not title:
+            title = f"Claude Plan - {datetime.now().strftime('%Y-%m-%d %H:%M')}"
+
+        now = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+        issue_body = f"""# Claude Plan
+
+## 요청 내용
+{prompt}
+
+## 생성 정보
+- **생성 시간**: {now}
+- **생성자**: Claude Code Hook
+- **트리거**: user-prompt-submit
+
+---
+*이 이슈는 Claude Code의 Plan → Issue Hook에 의해 자동으로 생성되었습니다.*"""
+
+        token, owner, repo = env_get(env, 'GITHUB_TOKEN'), env_get(env, 'GITHUB_OWNER'), env_get(env, 'GITHUB_REPO')
+        if not (token and owner and repo):
+            log("GITHUB_TOKEN/GITHUB_OWNER/GITHUB_REPO 환경 변수가 없음")
+            return 1, ''.join(output) + json.dumps({"success": False, "error": "Missing GitHub configuration"}) + '\n', ''
+
+        log("GitHub Issue 생성 중...")
+        try:
+            status, response = self.github.request(
+                'POST', f"/repos/{owner}/{repo}/issues", token,
+                env_get(env, 'GITHUB_API_BASE_URL', 'https://api.github.com'),
+                {"title": title, "body": issue_body, "labels": ISSUE_LABELS}
+            )
+        except (http.client.HTTPException, OSError) as e:
+            status, response = None, str(e)
+
+        issue_number = response.get('number') if isinstance(response, dict) else None
+        if issue_number:
+            log(f"GitHub Issue #{issue_number} 생성 완료")
+            if env_get(env, 'GITHUB_PROJECT_NUMBER'):
+                log("Project에 Issue 추가 시도...")
+            return 0, ''.join(output) + json.dumps({"success": True, "issue_number": issue_number}) + '\n', ''
+
+        log(f"GitHub Issue 생성 실패 ({status}): {response}")
+        return 1, ''.join(output) + json.dumps({"success": False, "error": "Issue creation failed"}) + '\n', ''
+
+    def handle_todo_to_project(self, payload, cwd, env):
+        """TodoWrite 결과를 처리합니다. (todo-to-project.sh 대응)"""
+        output = []
+        log = functools.partial(self.log, env=env, output=output)
+        log("Todo to Project Hook 실행 시작")
+        log("Hook data 수신: " + payload.rstrip('\n'))
+        try:
+            hook_data = json.loads(payload)
+        except ValueError:
+            hook_data = {}
+        if not isinstance(hook_data, dict) or hook_data.get('tool_name') != 'TodoWrite':
+            log("TodoWrite 도구가 아님. Hook 종료.")
+            return 0, ''.join(output), ''
+
+        tool_input = hook_data.get('tool_input')
+        todos = tool_input.get('todos') if isinstance(tool_input, dict) else None
+        if todos is None or todos == '':
+            log("Todo 데이터가 없음. Hook 종료.")
+            return 0, ''.join(output), ''
+
+        log("Todo 데이터 처리 시작")
+        try:
+            for todo in todos:
+                content = todo.get('content', '')
+                status = todo.get('status', 'pending')
+                log(f"Processing todo {todo.get('id', '')}: {status}")
+                if status == 'completed':
+                    log(f"Todo completed: {content}")
+                elif status == 'in_progress':
+                    log(f"Todo in progress: {content}")
+                elif status == 'pending':
+                    log(f"New todo: {content}")
+        except Exception as e:
+            # .sh와 같이 잘못된 todo 항목은 기록만 하고 성공으로 처리
+            log(f"Error processing todos: {e}")
+
+        output.append(json.dumps({"success": True, "processed": True}) + '\n')
+        log("Todo to Project Hook 실행 완료")
+        return 0, ''.join(output), ''
+
+    def handle_update_index(self, payload, cwd, env):
+        """요청한 저장소(cwd)와 클라이언트 환경 변수로 update_index_md hook을 실행합니다.
+
+        직접 실행(update_index_md.py)과 같이 .env는 적용하지 않으며, git/claude 하위 프로세스도
+        클라이언트 환경(GIT_DIR, PATH, SUMMARIZER_CONFIG_PATH 등)을 그대로 상속합니다.
+        """
+        with self.index_lock:
+            stdout, stderr = io.StringIO(), io.StringIO()
+            previous_cwd = os.getcwd()
+            try:
+                with contextlib.redirect_stdout(stdout), contextlib.redirect_stderr(stderr), \
+                        swapped_environ(env):
+                    os.chdir(cwd)
+                    exit_code = update_index_md.run_hook(self.executor)
+            except Exception as e:
+                stderr.write(f"index.md 업데이트 중 오류 발생: {e}\n")
+                exit_code = 1
+            finally:
+                os.chdir(previous_cwd)
+            return exit_code, stdout.getvalue(), stderr.getvalue()
+
+    def dispatch(self, request):
+        handlers = {
+            'plan-to-issue': self.handle_plan_to_issue,
+            'todo-to-project': self.handle_todo_to_project,
+            'update-index': self.handle_update_index,
+        }
+        event = request.get('event')
+        handler = handlers.get(event)
+        if handler is None:
+            return 2, '', f"알 수 없는 이벤트: {event}\n"
+        client_env = request.get('env') or dict(os.environ)
+        # update-index는 .env를 읽지 않는 update_index_md.py와 동일하게 클라이언트 환경만 사용
+        env = client_env if event == 'update-index' else self.config.env_for(client_env)
+        return handler(request.get('payload', ''), request.get('cwd') or os.getcwd(), env)
+
+@contextlib.contextmanager
+def swapped_environ(env):
+    """os.environ을 요청 환경으로 잠시 바꿉니다. (index_lock 안에서만 사용)"""
+    saved = dict(os.environ)
+    os.environ.clear()
+    os.environ.update(env)
+    try:
+        yield
+    finally:
+        os.environ.clear()
+        os.environ.update(saved)
+
+class HookRequestHandler(socketserver.BaseRequestHandler):
+    """요청 JSON을 EOF까지 읽고, 처리 결과를 JSON으로 응답합니다."""
+
+    def handle(self):
+        daemon = self.server.daemon_state
+        chunks, size = [], 0
+        while size <= MAX_REQUEST_SIZE:
+            chunk = self.request.recv(65536)
+            if not chunk:
+                break
+            chunks.append(chunk)
+            size += len(chunk)
+
+        try:
+            request = json.loads(b''.join(chunks).decode('utf-8'))
+            if request.get('event') == 'shutdown':
+                threading.Thread(target=self.server.shutdown, daemon=True).start()
+                exit_code, stdout, stderr = 0, '', ''
+            else:
+                exit_code, stdout, stderr = daemon.dispatch(request)
+        except Exception as e:
+            daemon.log(f"[Daemon] 요청 처리 중 오류: {e}")
+            exit_code, stdout, stderr = 1, '', f"데몬 요청 처리 중 오류: {e}\n"
+
+        response = json.dumps({"exit_code": exit_code, "stdout": stdout, "stderr": stderr}, ensure_ascii=False)
+        self.request.sendall(response.encode('utf-8'))
+
+class HookServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    daemon_threads = True
+
+    def __init__(self, path, daemon_state):
+        self.daemon_state = daemon_state
+        # bind 직후 chmod하면 그 사이에 다른 사용자가 연결할 수 있으므로 처음부터 0600으로 생성
+        previous_umask = os.umask(0o177)
+        try:
+            super().__init__(path, HookRequestHandler)
+        finally:
+            os.umask(previous_umask)
+
+    def process_request(self, request, client_address):
+        self.daemon_state.track_request(1)
+        super().process_request(request, client_address)
+
+    def process_request_thread(self, request, client_address):
+        try:
+            super().process_request_thread(request, client_address)
+        finally:
+            self.daemon_state.track_request(-1)
+
+def socket_in_use(path):
+    """다른 데몬이 이미 소켓에서 응답 중인지 확인합니다."""
+    sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        sock.connect(path)
+        return True
+    except OSError:
+        return False
+    finally:
+        sock.close()
+
+def watch_idle(server, daemon_state):
+    """IDLE_TIMEOUT 동안 요청이 없으면 서버를 종료합니다."""
+    while True:
+        time.sleep(min(IDLE_TIMEOUT, 5))
+        if daemon_state.is_idle():
+            daemon_state.log(f"[Daemon] {IDLE_TIMEOUT}초 동안 요청이 없어 데몬을 종료합니다.")
+            server.shutdown()
+            return
+
+def main():
+    if not prepare_socket_dir():
+        print(f"소켓 디렉토리를 안전하게 사용할 수 없습니다: {os.path.dirname(SOCKET_PATH)}", file=sys.stderr)
+        sys.exit(1)
+    # 동시에 실행된 클라이언트들이 데몬을 중복으로 띄우지 않도록 시작 과정을 잠급니다.
+    with open(SOCKET_PATH + '.lock', 'w') as start_lock:
+        fcntl.flock(start_lock, fcntl.LOCK_EX)
+        if socket_in_use(SOCKET_PATH):
+            return
+        if os.path.exists(SOCKET_PATH):
+            os.unlink(SOCKET_PATH)
+        daemon_state = HookDaemon()
+        server = HookServer(SOCKET_PATH, daemon_state)
+        socket_inode = os.stat(SOCKET_PATH).st_ino
+
+    signal.signal(signal.SIGTERM, lambda *_: threading.Thread(target=server.shutdown, daemon=True).start())
+    threading.Thread(target=watch_idle, args=(server, daemon_state), daemon=True).start()
+    daemon_state.log(f"[Daemon] 데몬 시작 (pid {os.getpid()}, socket {SOCKET_PATH})")
+
+    try:
+        server.serve_forever()
+    finally:
+        server.server_close()
+        daemon_state.executor.shutdown(wait=False)
+        daemon_state.github.close()
+        # 다른 데몬이 소켓을 다시 만든 경우에는 지우지 않습니다.
+        with contextlib.suppress(OSError):
+            if os.stat(SOCKET_PATH).st_ino == socket_inode:
+                os.unlink(SOCKET_PATH)
+        daemon_state.log("[Daemon] 데몬 종료")
+
+
+if __name__ == "__main__":
+    main()
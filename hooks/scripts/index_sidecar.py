@@ -0,0 +1,239 @@
+#!/usr/bin/env python3
+"""
+index.md 사이드카 인덱스 (SQLite)
+저장소 루트의 .index.db에 파일 경로 → 요약, blob SHA, 갱신 시각, 요약 백엔드를 저장하여
+index.md를 다시 파싱하지 않고 경로/접두사/전문 검색으로 빠르게 조회할 수 있게 합니다.
+update_index_md.py가 index.md와 함께 증분으로 갱신합니다.
+
+사용법:
+  index_sidecar.py <path>             파일 요약 조회
+  index_sidecar.py --prefix <prefix>  경로 접두사로 조회 (예: hooks/scripts/)
+  index_sidecar.py --search <text>    경로/요약 전문 검색
+  index_sidecar.py --rebuild          모든 index.md에서 사이드카 인덱스를 다시 생성
+"""
+
+import os
+import sys
+import json
+import argparse
+import sqlite3
+import subprocess
+from datetime import datetime
+
+# --- 설정 ---
+SIDECAR_FILE = ".index.db"
+SKIP_DIRS = [".git", "node_modules", "__pycache__", ".index_backups"]
+DEFAULT_LIMIT = 50
+BUSY_TIMEOUT = 5  # 다른 프로세스가 쓰는 중일 때 대기 시간 (초)
+# --- 설정 끝 ---
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS entries (
+    path TEXT PRIMARY KEY,
+    summary TEXT NOT NULL,
+    blob_sha TEXT,
+    updated_at TEXT NOT NULL,
+    backend TEXT
+);
+"""
+
+# 외부 콘텐츠 FTS5 테이블과 동기화 트리거 (trigram: 한국어 부분 문자열 검색 지원)
+FTS_SCHEMA = """
+CREATE VIRTUAL TABLE IF NOT EXISTS entries_fts USING fts5(
+    path, summary, content='entries', content_rowid='rowid', tokenize='trigram'
+);
+CREATE TRIGGER IF NOT EXISTS entries_ai AFTER INSERT ON entries BEGIN
+    INSERT INTO entries_fts(rowid, path, summary) VALUES (new.rowid, new.path, new.summary);
+END;
+CREATE TRIGGER IF NOT EXISTS entries_ad AFTER DELETE ON entries BEGIN
+    INSERT INTO entries_fts(entries_fts, rowid, path, summary) VALUES ('delete', old.rowid, old.path, old.summary);
+END;
+CREATE TRIGGER IF NOT EXISTS entries_au AFTER UPDATE ON entries BEGIN
+    INSERT INTO entries_fts(entries_fts, rowid, path, summary) VALUES ('delete', old.rowid, old.path, old.summary);
+    INSERT INTO entries_fts(rowid, path, summary) VALUES (new.rowid, new.path, new.summary);
+END;
+"""
+
+def open_index(db_path=SIDECAR_FILE):
+    """사이드카 인덱스를 열고 필요하면 스키마를 생성합니다."""
+    conn = sqlite3.connect(db_path, timeout=BUSY_TIMEOUT)
+    conn.row_factory = sqlite3.Row
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    with conn:
+        conn.executescript(SCHEMA)
+        try:
+            conn.executescript(FTS_SCHEMA)
+        except sqlite3.OperationalError:
+            pass  # FTS5/trigram 미지원 SQLite: LIKE 검색으로 대체
+    return conn
+
+def has_fts(conn):
+    return conn.execute(
+        "SELECT 1 FROM sqlite_master WHERE name = 'entries_fts'"
+    ).fetchone() is not None
+
+def upsert_entry(conn, path, summary, blob_sha=None, backend=None):
+    """항목을 추가하거나 갱신합니다. backend가 None이면 기존 값을 유지합니다."""
+    with conn:
+        conn.execute(
+            """INSERT INTO entries (path, summary, blob_sha, updated_at, backend)
+               VALUES (?, ?, ?, ?, ?)
+               ON CONFLICT(path) DO UPDATE SET
+                   summary = excluded.summary,
+                   blob_sha = COALESCE(excluded.blob_sha, entries.blob_sha),
+                   updated_at = excluded.updated_at,
+                   backend = COALESCE(excluded.backend, entries.backend)""",
+            (path, summary, blob_sha, datetime.now().isoformat(timespec='seconds'), backend)
+        )
+
+def remove_entry(conn, path):
+    with conn:
+        conn.execute("DELETE FROM entries WHERE path = ?", (path,))
+
+def get_entry(conn, path):
+    """경로로 항목을 조회합니다. 없으면 None."""
+    row = conn.execute("SELECT * FROM entries WHERE path = ?", (path,)).fetchone()
+    return dict(row) if row else None
+
+def find_by_prefix(conn, prefix, limit=DEFAULT_LIMIT):
+    """경로 접두사로 항목을 조회합니다. (기본 키 인덱스 범위 검색)"""
+    # 상한은 가장 큰 코드 포인트(U+10FFFF)로 두어 BMP 밖의 문자(이모지 등)가 포함된 경로도 조회
+    rows = conn.execute(
+        "SELECT * FROM entries WHERE path >= ? AND path < ? ORDER BY path LIMIT ?",
+        (prefix, prefix + chr(0x10FFFF), limit)
+    )
+    return [dict(row) for row in rows]
+
+def search(conn, text, limit=DEFAULT_LIMIT):
+    """경로와 요약에서 text를 검색합니다. trigram FTS는 3글자 이상에서만 사용합니다."""
+    if has_fts(conn) and len(text) >= 3:
+        rows = conn.execute(
+            """SELECT entries.* FROM entries_fts
+               JOIN entries ON entries.rowid = entries_fts.rowid
+               WHERE entries_fts MATCH ? ORDER BY rank LIMIT ?""",
+            ('"' + text.replace('"', '""') + '"', limit)
+        )
+    else:
+        pattern = '%' + text.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_') + '%'
+        rows = conn.execute(
+            """SELECT * FROM entries WHERE path LIKE ? ESCAPE '\\' OR summary LIKE ? ESCAPE '\\'
+               ORDER BY path LIMIT ?""",
+            (pattern, pattern, limit)
+        )
+    return [dict(row) for row in rows]
+
+def get_blob_shas(paths=None):
+    """HEAD 커밋에서 파일들의 blob SHA를 한 번의 git 호출로 가져옵니다. (paths가 None이면 전체)"""
+    if paths is not None and not paths:
+        return {}
+    try:
+        result = subprocess.run(
+            ['git', 'ls-tree', '-r', '-z', 'HEAD', '--', *(paths or [])],
+            capture_output=True, text=True, check=True
+        )
+    except (subprocess.CalledProcessError, FileNotFoundError):
+        return {}
+    shas = {}
+    for record in result.stdout.split('\0'):
+        if '\t' in record:
+            meta, path = record.split('\t', 1)
+            shas[path] = meta.split()[2]
+    return shas
+
+def parse_index_md(index_path):
+    """index.md의 `- `파일`: 요약` 항목들을 (파일명, 요약) 목록으로 반환합니다."""
+    entries = []
+    with open(index_path, 'r', encoding='utf-8') as f:
+        for line in f:
+            line = line.strip()
+            if line.startswith('- `') and '`: ' in line:
+                file_name, summary = line[3:].split('`: ', 1)
+                entries.append((file_name, summary))
+    return entries
+
+def rebuild_index(conn, root='.'):
+    """저장소의 모든 index.md를 읽어 사이드카 인덱스를 다시 만들고 항목 수를 반환합니다."""
+    entries = []
+    for directory, dir_names, file_names in os.walk(root):
+        dir_names[:] = [d for d in dir_names if d not in SKIP_DIRS]
+        if 'index.md' not in file_names:
+            continue
+        relative_dir = os.path.relpath(directory, root)
+        for file_name, summary in parse_index_md(os.path.join(directory, 'index.md')):
+            path = file_name if relative_dir == '.' else os.path.join(relative_dir, file_name)
+            entries.append((path, summary))
+
+    shas = get_blob_shas()
+    now = datetime.now().isoformat(timespec='seconds')
+    with conn:
+        conn.execute("DELETE FROM entries")
+        conn.executemany(
+            "INSERT OR REPLACE INTO entries (path, summary, blob_sha, updated_at, backend) VALUES (?, ?, ?, ?, ?)",
+            [(path, summary, shas.get(path), now, None) for path, summary in entries]
+        )
+    return len(entries)
+
+def find_index_file(start='.'):
+    """현재 디렉토리부터 상위로 올라가며 사이드카 인덱스 파일(없으면 저장소 루트 기준 경로)을 찾습니다."""
+    directory = os.path.abspath(start)
+    while True:
+        candidate = os.path.join(directory, SIDECAR_FILE)
+        if os.path.exists(candidate) or os.path.exists(os.path.join(directory, '.git')):
+            return candidate
+        parent = os.path.dirname(directory)
+        if parent == directory:
+            return os.path.join(os.path.abspath(start), SIDECAR_FILE)
+        directory = parent
+
+def print_entries(entries, as_json):
+    for entry in entries:
+        if as_json:
+            print(json.dumps(entry, ensure_ascii=False))
+        else:
+            print(f"{entry['path']}\t{entry['summary']}")
+
+def main():
+    parser = argparse.ArgumentParser(description="index.md 사이드카 인덱스 조회")
+    parser.add_argument('path', nargs='?', help="요약을 조회할 파일 경로")
+    parser.add_argument('--prefix', help="경로 접두사로 조회")
+    parser.add_argument('--search', help="경로/요약 전문 검색")
+    parser.add_argument('--rebuild', action='store_true', help="모든 index.md에서 인덱스를 다시 생성")
+    parser.add_argument('--limit', type=int, default=DEFAULT_LIMIT, help="최대 결과 수")
+    parser.add_argument('--json', action='store_true', help="JSON Lines 형식으로 출력")
+    parser.add_argument('--db', help=f"사이드카 인덱스 경로 (기본: 저장소 루트의 {SIDECAR_FILE})")
+    args = parser.parse_args()
+
+    db_path = os.path.abspath(args.db or find_index_file())
+    root = os.path.dirname(db_path)
+
+    if args.rebuild:
+        conn = open_index(db_path)
+        os.chdir(root)
+        count = rebuild_index(conn)
+        conn.close()
+        print(f"사이드카 인덱스 재생성 완료: {count}개 항목 ({db_path})")
+        return
+
+    if not os.path.exists(db_path):
+        print(f"사이드카 인덱스가 없습니다: {db_path} (--rebuild로 생성)", file=sys.stderr)
+        sys.exit(1)
+
+    conn = open_index(db_path)
+    if args.prefix is not None:
+        print_entries(find_by_prefix(conn, args.prefix, args.limit), args.json)
+    elif args.search:
+        print_entries(search(conn, args.search, args.limit), args.json)
+    elif args.path:
+        entry = get_entry(conn, os.path.relpath(os.path.abspath(args.path), root))
+        if entry is None:
+            print(f"항목을 찾을 수 없습니다: {args.path}", file=sys.stderr)
+            sys.exit(1)
+        print_entries([entry], args.json)
+    else:
+        parser.print_help()
+        sys.exit(2)
+
+
+if __name__ == "__main__":
+    main()
@@ -3,15 +3,72 @@ import sys
 import subprocess
 import shutil
 import json
+import re
+import ast
+import urllib.request
+import time
+import fcntl
+import socket
+import tempfile
+import contextlib
+import sqlite3
 from datetime import datetime
 
+SCRIPT_DIR = os.path.dirname(os.path.realpath(__file__))
+sys.path.insert(0, SCRIPT_DIR)
+
+import index_sidecar
+
 # --- 설정 ---
 BACKUP_DIR = ".index_backups"
 MAX_RETRIES = 3
 PROTECTED_DIRS = [".git", "node_modules", "__pycache__", ".index_backups"]
 CLAUDE_CLI_TIMEOUT = 30  # Claude CLI 호출 타임아웃 (초)
+INCREMENTAL_KEEP_LINES = 2    # 수정(M) 시 변경 줄 수가 이 값 이하이면 기존 요약 유지
+INCREMENTAL_DIFF_LINES = 60   # 이 값 이하이면 전체 파일 대신 "기존 요약 + diff"로 요약
+FAILED_SUMMARIES = ["파일이 비어 있거나 존재하지 않습니다.", "요약 생성 중 오류 발생"]
+INDEX_LOCK_FILE = "index.md.lock"     # 디렉토리별 index.md 잠금 파일 (BACKUP_DIR 안에 생성)
+RUN_LOCK_FILE = "index_md_hook.lock"  # 저장소 단위 실행 잠금 파일 (.git 디렉토리 안에 생성)
+RUN_LOCK_STALE_SECONDS = 300  # 이 시간 동안 진행이 없는 실행은 중단된 것으로 보고 대체
+RUN_LOCK_WAIT_SECONDS = 360   # 다른 실행이 끝나기를 기다리는 최대 시간 (초)
+RUN_LOCK_POLL_SECONDS = 0.5
+# 요약 백엔드 설정 파일 (없으면 아래 기본값 사용, SUMMARIZER_CONFIG_PATH 환경 변수로 변경 가능)
+SUMMARIZER_CONFIG_PATH = os.path.join(os.path.dirname(SCRIPT_DIR), "configs", "summarizer.json")
+DEFAULT_SUMMARIZER_CONFIG = {
+    "default_backends": ["claude-cli", "http", "local"],  # 앞에서부터 시도하는 백엔드 순서
+    "backends_by_extension": {},  # 확장자 또는 파일명별 백엔드 순서 (예: {".md": ["local"]})
+    "trivial_file_size": 200,     # 이 크기(바이트) 이하 파일은 모델 호출 없이 로컬 요약
+    "http": {},                   # {"url": ..., "timeout": ..., "headers": {...}}
+}
+PROMPT_BACKENDS = ["claude-cli", "http"]
+LOCAL_METADATA_FILES = ["package.json", "composer.json", "pyproject.toml", "Cargo.toml", "setup.cfg", "setup.py"]
+# 확장자별 주석 기호 (목록에 없는 확장자는 LOCAL_DEFAULT_COMMENT_MARKERS 사용)
+_C_STYLE_MARKERS = ["/*", "//", "*"]
+LOCAL_COMMENT_MARKERS = {
+    ".py": ["#", '"""', "'''"], ".sh": ["#"], ".bash": ["#"], ".zsh": ["#"], ".rb": ["#"], ".pl": ["#"],
+    ".yml": ["#"], ".yaml": ["#"], ".toml": ["#"], ".cfg": ["#", ";"], ".ini": [";", "#"], ".r": ["#"],
+    ".c": _C_STYLE_MARKERS, ".h": _C_STYLE_MARKERS, ".cc": _C_STYLE_MARKERS, ".cpp": _C_STYLE_MARKERS,
+    ".hpp": _C_STYLE_MARKERS, ".m": _C_STYLE_MARKERS, ".cs": _C_STYLE_MARKERS, ".java": _C_STYLE_MARKERS,
+    ".kt": _C_STYLE_MARKERS, ".go": _C_STYLE_MARKERS, ".rs": _C_STYLE_MARKERS, ".swift": _C_STYLE_MARKERS,
+    ".js": _C_STYLE_MARKERS, ".jsx": _C_STYLE_MARKERS, ".ts": _C_STYLE_MARKERS, ".tsx": _C_STYLE_MARKERS,
+    ".css": _C_STYLE_MARKERS, ".scss": _C_STYLE_MARKERS, ".php": _C_STYLE_MARKERS + ["#"],
+    ".sql": ["--", "/*", "*"], ".lua": ["--"], ".hs": ["--"],
+    ".html": ["<!--"], ".xml": ["<!--"], ".md": ["<!--"], ".markdown": ["<!--"],
+    ".el": [";"], ".lisp": [";"], ".clj": [";"], ".asm": [";"], ".vim": ['"'],
+}
+LOCAL_DEFAULT_COMMENT_MARKERS = ["<!--", "/*", "//", "--", "#", ";", "*"]
+# '#'으로 시작하지만 주석이 아닌 전처리기 지시문 (#include, #pragma 등)
+PREPROCESSOR_DIRECTIVE = re.compile(
+    r'#\s*(include|import|pragma|define|undef|ifdef|ifndef|if|elif|else|endif|error|warning|line|region|endregion)\b'
+)
+LOCAL_FILE_KINDS = {".py": "Python", ".sh": "셸 스크립트", ".js": "JavaScript", ".ts": "TypeScript",
+                    ".json": "JSON 설정", ".yml": "YAML 설정", ".yaml": "YAML 설정", ".toml": "TOML 설정",
+                    ".md": "마크다운 문서", ".txt": "텍스트"}
 # --- 설정 끝 ---
 
+_claude_cli_available = None
+_summarizer_config = None  # (설정 파일 경로, mtime, 설정)
+
 def check_claude_cli():
     """Claude CLI가 설치되어 있는지 확인합니다."""
     try:
@@ -22,13 +79,10 @@ def check_claude_cli():
     except (subprocess.TimeoutExpired, FileNotFoundError, subprocess.CalledProcessError):
         pass
     
-    print("오류: Claude CLI를 찾을 수 없습니다.", file=sys.stderr)
+    print("경고: Claude CLI를 찾을 수 없습니다.", file=sys.stderr)
     print("Claude CLI 설치: https://docs.anthropic.com/en/docs/claude-code", file=sys.stderr)
     return False
 
-if not check_claude_cli():
-    sys.exit(1)
-
 def create_backup(file_path):
     """index.md 파일의 백업을 생성합니다."""
     if not os.path.exists(file_path):
@@ -76,13 +130,140 @@ def restore_backup(original_path, backup_path):
     """백업에서 원본 파일을 복원합니다."""
     if backup_path and os.path.exists(backup_path):
         try:
-            shutil.copy2(backup_path, original_path)
+            with open(backup_path, 'r', encoding='utf-8') as f:
+                atomic_write(original_path, f.read())
             print(f"백업에서 복원: {original_path}")
             return True
         except Exception as e:
             print(f"백업 복원 실패: {e}", file=sys.stderr)
     return False
 
+def atomic_write(file_path, content):
+    """임시 파일에 쓰고 fsync한 뒤 rename하여, 중간에 중단되어도 파일이 잘리지 않게 합니다."""
+    directory = os.path.dirname(file_path) or '.'
+    mode = os.stat(file_path).st_mode & 0o777 if os.path.exists(file_path) else 0o644
+    fd, temp_path = tempfile.mkstemp(dir=directory, prefix='.index.md.', suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            f.write(content)
+            f.flush()
+            os.fsync(f.fileno())
+        os.chmod(temp_path, mode)
+        os.replace(temp_path, file_path)
+    except BaseException:
+        if os.path.exists(temp_path):
+            os.unlink(temp_path)
+        raise
+    
+    # rename 자체가 디스크에 기록되도록 디렉토리도 fsync
+    dir_fd = os.open(directory, os.O_RDONLY)
+    try:
+        os.fsync(dir_fd)
+    finally:
+        os.close(dir_fd)
+
+@contextlib.contextmanager
+def index_lock(directory):
+    """디렉토리의 index.md에 대한 advisory 잠금을 잡습니다. (다른 hook 실행과의 동시 수정 방지)"""
+    lock_dir = os.path.join(directory, BACKUP_DIR)
+    os.makedirs(lock_dir, exist_ok=True)
+    with open(os.path.join(lock_dir, INDEX_LOCK_FILE), 'w') as lock_file:
+        fcntl.flock(lock_file, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+def get_run_lock_path():
+    """저장소 단위 실행 잠금 파일 경로를 반환합니다. (worktree 간 공유, git 저장소가 아니면 None)"""
+    try:
+        result = subprocess.run(
+            ['git', 'rev-parse', '--git-common-dir'],
+            capture_output=True, text=True, check=True
+        )
+        return os.path.join(result.stdout.strip(), RUN_LOCK_FILE)
+    except (subprocess.CalledProcessError, FileNotFoundError):
+        return None
+
+def _is_process_alive(pid):
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        pass
+    return True
+
+def _is_run_lock_stale(owner):
+    """잠금 소유 실행이 종료되었거나 RUN_LOCK_STALE_SECONDS 동안 진행이 없으면 stale로 판단합니다."""
+    if time.time() - owner.get('heartbeat', 0) > RUN_LOCK_STALE_SECONDS:
+        return True
+    return owner.get('host') == socket.gethostname() and not _is_process_alive(owner.get('pid', 0))
+
+@contextlib.contextmanager
+def _locked_run_lock_file(lock_path):
+    """실행 잠금 파일을 배타적으로 열고 (파일, 현재 소유자 정보)를 반환합니다."""
+    with open(lock_path, 'a+', encoding='utf-8') as f:
+        fcntl.flock(f, fcntl.LOCK_EX)
+        try:
+            f.seek(0)
+            try:
+                owner = json.loads(f.read() or 'null')
+            except ValueError:
+                owner = None
+            yield f, owner
+        finally:
+            fcntl.flock(f, fcntl.LOCK_UN)
+
+def _write_run_lock_owner(f, owner):
+    f.seek(0)
+    f.truncate()
+    if owner is not None:
+        f.write(json.dumps(owner))
+    f.flush()
+
+def acquire_run_lock(lock_path):
+    """저장소 단위 실행 잠금을 얻고 토큰을 반환합니다.
+
+    진행 중인 실행이 있으면 끝날 때까지 기다리고, 그 실행이 stale이면 대신 잠금을 가져옵니다.
+    RUN_LOCK_WAIT_SECONDS 안에 얻지 못하면 None을 반환합니다.
+    """
+    token = f"{socket.gethostname()}-{os.getpid()}-{time.time_ns()}"
+    deadline = time.monotonic() + RUN_LOCK_WAIT_SECONDS
+    waiting = False
+    while True:
+        with _locked_run_lock_file(lock_path) as (f, owner):
+            if owner is None or _is_run_lock_stale(owner):
+                if owner is not None:
+                    print(f"중단된 이전 실행(pid {owner.get('pid')})을 대체합니다.", file=sys.stderr)
+                _write_run_lock_owner(f, {
+                    "token": token, "pid": os.getpid(), "host": socket.gethostname(),
+                    "heartbeat": time.time()
+                })
+                return token
+        
+        if time.monotonic() >= deadline:
+            return None
+        if not waiting:
+            print(f"다른 index.md Hook 실행(pid {owner.get('pid')})이 끝나기를 기다립니다...")
+            waiting = True
+        time.sleep(RUN_LOCK_POLL_SECONDS)
+
+def refresh_run_lock(lock_path, token):
+    """실행 잠금의 heartbeat를 갱신합니다. 더 새로운 실행이 잠금을 가져갔다면 False를 반환합니다."""
+    with _locked_run_lock_file(lock_path) as (f, owner):
+        if owner is None or owner.get('token') != token:
+            return False
+        owner['heartbeat'] = time.time()
+        _write_run_lock_owner(f, owner)
+        return True
+
+def release_run_lock(lock_path, token):
+    """자신이 소유한 경우에만 실행 잠금을 해제합니다."""
+    with _locked_run_lock_file(lock_path) as (f, owner):
+        if owner is not None and owner.get('token') == token:
+            _write_run_lock_owner(f, None)
+
 def get_changed_files_with_status():
     """가장 최근 커밋에서 변경된 파일 목록과 상태를 가져옵니다."""
     try:
@@ -110,29 +291,81 @@ def get_changed_files_with_status():
         print(f"Git diff 실행 중 오류 발생: {e}", file=sys.stderr)
         return []
 
-def summarize_file_with_claude(file_path):
-    """Claude CLI를 사용하여 파일 내용을 한 줄로 요약합니다. (재시도 로직 포함)"""
-    if not os.path.exists(file_path) or os.path.getsize(file_path) == 0:
-        return "파일이 비어 있거나 존재하지 않습니다."
+def is_claude_cli_available():
+    """Claude CLI 사용 가능 여부를 실행마다 처음 필요할 때 한 번만 확인합니다. (run_hook에서 초기화)"""
+    global _claude_cli_available
+    if _claude_cli_available is None:
+        _claude_cli_available = check_claude_cli()
+        if not _claude_cli_available:
+            print("Claude CLI 없이 다른 요약 백엔드로 대체합니다.", file=sys.stderr)
+    return _claude_cli_available
+
+def _is_backend_list(value):
+    return isinstance(value, list) and all(isinstance(name, str) for name in value)
+
+def _is_number(value):
+    return isinstance(value, (int, float)) and not isinstance(value, bool)
+
+def is_valid_summarizer_value(key, value):
+    """요약 설정 항목의 값 형식이 올바른지 확인합니다. (알 수 없는 항목은 검사하지 않음)"""
+    if key == 'default_backends':
+        return _is_backend_list(value)
+    if key == 'backends_by_extension':
+        return isinstance(value, dict) and all(_is_backend_list(chain) for chain in value.values())
+    if key == 'trivial_file_size':
+        return _is_number(value)
+    if key == 'http':
+        return (isinstance(value, dict)
+                and isinstance(value.get('url') or '', str)
+                and _is_number(value.get('timeout', CLAUDE_CLI_TIMEOUT))
+                and isinstance(value.get('headers') or {}, dict)
+                and all(isinstance(v, str) for v in (value.get('headers') or {}).values()))
+    return True
+
+def load_summarizer_config():
+    """요약 백엔드 설정(summarizer.json)을 읽어 기본값과 병합합니다. (파일이 변경된 경우에만 다시 읽음)"""
+    global _summarizer_config
+    config_path = os.environ.get('SUMMARIZER_CONFIG_PATH', SUMMARIZER_CONFIG_PATH)
+    try:
+        mtime = os.stat(config_path).st_mtime_ns
+    except OSError:
+        mtime = None
     
+    if _summarizer_config is None or _summarizer_config[:2] != (config_path, mtime):
+        config = dict(DEFAULT_SUMMARIZER_CONFIG)
+        if mtime is not None:
+            try:
+                with open(config_path, 'r', encoding='utf-8') as f:
+                    loaded = json.load(f)
+                if not isinstance(loaded, dict):
+                    raise ValueError("최상위 값이 JSON 객체가 아닙니다")
+            except (OSError, ValueError) as e:
+                print(f"요약 설정 파일 로드 실패: {e}", file=sys.stderr)
+                loaded = {}
+            for key, value in loaded.items():
+                if not is_valid_summarizer_value(key, value):
+                    print(f"요약 설정 '{key}' 값이 올바르지 않아 기본값을 사용합니다: {value!r}", file=sys.stderr)
+                    continue
+                config[key] = value
+        _summarizer_config = (config_path, mtime, config)
+    return _summarizer_config[2]
+
+def get_backend_chain(file_path, size):
+    """파일에 적용할 요약 백엔드 순서를 반환합니다. 작은 파일은 로컬 요약만 사용합니다."""
+    config = load_summarizer_config()
+    if size <= config['trivial_file_size']:
+        return ['local']
+    
+    by_extension = config['backends_by_extension']
+    file_name = os.path.basename(file_path)
+    extension = os.path.splitext(file_name)[1].lower()
+    chain = by_extension.get(file_name) or by_extension.get(extension) or config['default_backends']
+    return [name for name in chain if name in SUMMARIZER_BACKENDS]
+
+def run_claude_prompt(file_path, prompt):
+    """Claude CLI로 프롬프트를 실행하고 첫 줄을 반환합니다. (재시도 로직 포함, 실패 시 None)"""
     for attempt in range(MAX_RETRIES):
         try:
-            with open(file_path, 'r', encoding='utf-8') as f:
-                content = f.read()
-            
-            # 파일 내용이 너무 길면 앞부분만 사용 (Claude CLI 입력 제한 고려)
-            if len(content) > 8000:  # 대략 8KB 제한
-                content = content[:8000] + "\n... (파일이 길어서 앞부분만 표시)"
-            
-            prompt = f"""다음 파일 내용의 핵심 역할을 한국어로 한 문장으로 요약해줘.
-파일의 전체적인 목적과 기능에 초점을 맞춰서 설명해줘.
-결과는 다른 부연 설명 없이, 오직 요약된 한 문장만 출력해줘.
-
-파일 경로: {file_path}
---- 파일 내용 ---
-{content}"""
-            
-            # Claude CLI 호출
             result = subprocess.run([
                 'claude', '-p', prompt
             ], capture_output=True, text=True, timeout=CLAUDE_CLI_TIMEOUT)
@@ -152,66 +385,346 @@ def summarize_file_with_claude(file_path):
             print(f"'{file_path}' 파일 요약 중 Claude CLI 오류 (시도 {attempt + 1}/{MAX_RETRIES}): {e}", file=sys.stderr)
         except Exception as e:
             print(f"'{file_path}' 파일 요약 중 오류 발생 (시도 {attempt + 1}/{MAX_RETRIES}): {e}", file=sys.stderr)
-        
-        if attempt == MAX_RETRIES - 1:
-            return "요약 생성 중 오류 발생"
+    
+    return None
+
+def summarize_with_claude_cli(file_path, prompt, content):
+    """'claude-cli' 백엔드: Claude CLI 하위 프로세스로 요약합니다."""
+    if not is_claude_cli_available():
+        return None
+    return run_claude_prompt(file_path, prompt)
+
+def summarize_with_http(file_path, prompt, content):
+    """'http' 백엔드: 설정된 HTTP 엔드포인트에 프롬프트를 POST하여 요약합니다.
+
+    응답은 {"summary": "..."} 형식의 JSON 또는 일반 텍스트를 받습니다.
+    """
+    http_config = load_summarizer_config().get('http') or {}
+    url = http_config.get('url')
+    if not url:
+        return None
+    
+    headers = {"Content-Type": "application/json"}
+    headers.update(http_config.get('headers') or {})
+    data = json.dumps({"prompt": prompt, "file_path": file_path}, ensure_ascii=False).encode('utf-8')
+    request = urllib.request.Request(url, data=data, headers=headers, method='POST')
+    try:
+        with urllib.request.urlopen(request, timeout=http_config.get('timeout', CLAUDE_CLI_TIMEOUT)) as response:
+            body = response.read().decode('utf-8')
+    except Exception as e:
+        print(f"'{file_path}' 파일 요약 중 HTTP 백엔드 오류: {e}", file=sys.stderr)
+        return None
+    
+    try:
+        data = json.loads(body)
+    except ValueError:
+        data = body
+    summary = data.get('summary') if isinstance(data, dict) else data
+    if not isinstance(summary, str):
+        return None
+    summary = summary.strip()
+    return summary.split('\n')[0] if summary else None
+
+def _first_sentence(text):
+    """텍스트의 첫 번째 비어 있지 않은 줄을 반환합니다."""
+    for line in text.strip().splitlines():
+        line = line.strip()
+        if line:
+            return line
+    return None
+
+def _summarize_package_metadata(file_name, content):
+    """package.json, pyproject.toml 등 패키지 메타데이터의 설명을 추출합니다."""
+    if file_name.endswith('.json'):
+        try:
+            data = json.loads(content)
+        except ValueError:
+            return None
+        if isinstance(data, dict) and data.get('description'):
+            name = data.get('name')
+            return f"{name}: {data['description']}" if name else data['description']
+        return None
+    
+    match = re.search(r'^\s*description\s*=\s*["\'](.+?)["\']', content, re.MULTILINE)
+    if match:
+        name = re.search(r'^\s*name\s*=\s*["\'](.+?)["\']', content, re.MULTILINE)
+        return f"{name.group(1)}: {match.group(1)}" if name else match.group(1)
+    return None
+
+def _summarize_markdown(content):
+    """마크다운 문서의 첫 제목과 첫 문단으로 요약합니다. (front matter 제외)"""
+    lines = content.splitlines()
+    if lines and lines[0].strip() == '---':
+        # YAML front matter는 닫는 '---'까지 건너뜀
+        for i, line in enumerate(lines[1:], 1):
+            if line.strip() in ('---', '...'):
+                lines = lines[i + 1:]
+                break
+    
+    title = None
+    for line in lines:
+        line = line.strip()
+        if not line or line.startswith(('<!--', '[![', '---')):
+            continue
+        if line.startswith('#'):
+            if title is None:
+                title = line.lstrip('#').strip()
+                continue
+            break
+        if title is None:
+            return line
+        return f"{title}: {line}"
+    return title
+
+def _summarize_python(content):
+    """Python 모듈 docstring의 첫 줄로 요약합니다."""
+    try:
+        docstring = ast.get_docstring(ast.parse(content))
+    except (SyntaxError, ValueError):
+        return None
+    return _first_sentence(docstring) if docstring else None
+
+def _summarize_leading_comment(extension, content):
+    """shebang 이후 파일 앞부분의 주석으로 요약합니다. 주석 기호는 확장자에 따라 고릅니다."""
+    markers = LOCAL_COMMENT_MARKERS.get(extension)
+    if markers is None:
+        markers = LOCAL_DEFAULT_COMMENT_MARKERS
+    for line in content.splitlines()[:30]:
+        line = line.strip()
+        if not line or line.startswith('#!') or (line.startswith('#') and 'coding' in line):
+            continue
+        if markers is LOCAL_DEFAULT_COMMENT_MARKERS and PREPROCESSOR_DIRECTIVE.match(line):
+            # 종류를 알 수 없는 파일의 #include, #pragma 등은 주석이 아닌 코드로 취급
+            return None
+        for marker in markers:
+            if line.startswith(marker):
+                text = line[len(marker):].strip(' */-=#>')
+                if text:
+                    return text
+                break
+        else:
+            # 주석이 아닌 코드가 시작되면 중단
+            return None
+    return None
+
+def summarize_with_local_heuristic(file_path, prompt, content):
+    """'local' 백엔드: 모델 호출 없이 docstring, 주석, 마크다운 제목, 패키지 메타데이터로 요약합니다.
+
+    단서가 없으면 파일 종류와 줄 수로 된 기본 설명을 반환하므로 항상 결과가 있습니다.
+    """
+    file_name = os.path.basename(file_path)
+    extension = os.path.splitext(file_name)[1].lower()
+    
+    summary = None
+    if file_name in LOCAL_METADATA_FILES:
+        summary = _summarize_package_metadata(file_name, content)
+    elif extension in ('.md', '.markdown'):
+        summary = _summarize_markdown(content)
+    elif extension == '.py':
+        summary = _summarize_python(content)
+    if not summary:
+        summary = _summarize_leading_comment(extension, content)
+    if summary:
+        return summary
+    
+    kind = LOCAL_FILE_KINDS.get(extension, f"{extension[1:].upper()}" if extension else "텍스트")
+    return f"{kind} 파일 ({len(content.splitlines())}줄)"
+
+SUMMARIZER_BACKENDS = {
+    'claude-cli': summarize_with_claude_cli,
+    'http': summarize_with_http,
+    'local': summarize_with_local_heuristic,
+}
+
+def run_backends(file_path, chain, prompt, content):
+    """백엔드를 순서대로 시도하여 첫 번째 요약과 사용한 백엔드 이름을 반환합니다."""
+    for name in chain:
+        summary = SUMMARIZER_BACKENDS[name](file_path, prompt, content)
+        if summary:
+            return summary, name
+    return None, None
+
+def summarize_file(file_path):
+    """설정된 백엔드로 파일 내용을 한 줄로 요약하고 (요약, 백엔드 이름)을 반환합니다."""
+    if not os.path.exists(file_path) or os.path.getsize(file_path) == 0:
+        return "파일이 비어 있거나 존재하지 않습니다.", None
+    
+    try:
+        with open(file_path, 'r', encoding='utf-8') as f:
+            content = f.read()
+    except Exception as e:
+        print(f"'{file_path}' 파일 읽기 중 오류 발생: {e}", file=sys.stderr)
+        return "요약 생성 중 오류 발생", None
+    
+    chain = get_backend_chain(file_path, len(content.encode('utf-8')))
+    
+    # 파일 내용이 너무 길면 앞부분만 사용 (Claude CLI 입력 제한 고려)
+    prompt_content = content
+    if len(prompt_content) > 8000:  # 대략 8KB 제한
+        prompt_content = prompt_content[:8000] + "\n... (파일이 길어서 앞부분만 표시)"
+    
+    prompt = f"""다음 파일 내용의 핵심 역할을 한국어로 한 문장으로 요약해줘.
+파일의 전체적인 목적과 기능에 초점을 맞춰서 설명해줘.
+결과는 다른 부연 설명 없이, 오직 요약된 한 문장만 출력해줘.
+
+파일 경로: {file_path}
+--- 파일 내용 ---
+{prompt_content}"""
+    
+    summary, backend = run_backends(file_path, chain, prompt, content)
+    if summary is None:
+        return "요약 생성 중 오류 발생", None
+    return summary, backend
+
+def summarize_diff(file_path, previous_summary, diff):
+    """기존 요약과 diff만으로 수정된 파일의 요약을 갱신합니다.
+
+    프롬프트를 사용하는 백엔드만 시도하며, 실패 시 (None, None)을 반환합니다.
+    백엔드 순서가 로컬 요약으로 시작하는 파일은 모델을 호출하지 않고 (None, None)을 반환합니다.
+    """
+    if not prefers_prompt_backend(file_path):
+        return None, None
+    size = os.path.getsize(file_path) if os.path.exists(file_path) else 0
+    chain = [name for name in get_backend_chain(file_path, size) if name in PROMPT_BACKENDS]
+    prompt = f"""다음은 파일의 기존 한 문장 요약과 이번 커밋의 변경 내용(diff)이야.
+변경 내용을 반영해서 파일의 핵심 역할을 한국어로 한 문장으로 다시 요약해줘.
+변경이 파일의 역할에 영향을 주지 않으면 기존 요약을 그대로 출력해줘.
+결과는 다른 부연 설명 없이, 오직 요약된 한 문장만 출력해줘.
+
+파일 경로: {file_path}
+기존 요약: {previous_summary}
+--- 변경 내용 ---
+{diff}"""
+    
+    return run_backends(file_path, chain, prompt, None)
+
+def get_diff_line_count(file_path):
+    """가장 최근 커밋에서 파일의 변경 줄 수(추가+삭제)를 반환합니다. 바이너리 등은 None."""
+    try:
+        result = subprocess.run(
+            ['git', 'diff', 'HEAD~1', 'HEAD', '--numstat', '--', file_path],
+            capture_output=True, text=True, check=True
+        )
+        added, deleted = result.stdout.split('\t')[:2]
+        return int(added) + int(deleted)
+    except (subprocess.CalledProcessError, ValueError):
+        return None
+
+def get_file_diff(file_path):
+    """가장 최근 커밋에서 파일의 diff 본문(헤더 제외)을 가져옵니다."""
+    try:
+        result = subprocess.run(
+            ['git', 'diff', 'HEAD~1', 'HEAD', '--unified=1', '--', file_path],
+            capture_output=True, text=True, check=True
+        )
+    except subprocess.CalledProcessError:
+        return None
+    lines = result.stdout.split('\n')
+    # "@@" 이전의 diff/index/---/+++ 헤더는 제외
+    for i, line in enumerate(lines):
+        if line.startswith('@@'):
+            return '\n'.join(lines[i:]).strip()
+    return None
+
+def get_index_entry(directory, file_name):
+    """index.md에 기록된 파일의 기존 요약을 반환합니다. 없으면 None."""
+    index_path = os.path.join(directory, 'index.md')
+    if not os.path.exists(index_path):
+        return None
+    
+    prefix = f'- `{file_name}`: '
+    with open(index_path, 'r', encoding='utf-8') as f:
+        for line in f:
+            if line.strip().startswith(prefix):
+                return line.strip()[len(prefix):]
+    return None
+
+def prefers_prompt_backend(file_path):
+    """파일의 백엔드 순서가 프롬프트 백엔드로 시작하는지 확인합니다.
+
+    로컬 요약이 먼저인 파일은 다시 요약해도 비용이 없으므로 증분 요약(기존 요약 유지, diff 프롬프트)을
+    사용하지 않습니다.
+    """
+    size = os.path.getsize(file_path) if os.path.exists(file_path) else 0
+    chain = get_backend_chain(file_path, size)
+    return bool(chain) and chain[0] in PROMPT_BACKENDS
+
+def summarize_changed_file(status, file_path):
+    """변경된 파일의 요약을 생성하고 (요약, 백엔드 이름)을 반환합니다.
+
+    프롬프트 백엔드를 먼저 사용하는 수정(M) 파일은 diff 크기에 따라 기존 요약을 유지(요약이 None)하거나
+    "기존 요약 + diff" 프롬프트로 갱신하고, 그 외에는 전체 내용을 요약합니다.
+    """
+    if status == 'M' and prefers_prompt_backend(file_path):
+        previous_summary = get_index_entry(os.path.dirname(file_path), os.path.basename(file_path))
+        if previous_summary and previous_summary not in FAILED_SUMMARIES:
+            changed_lines = get_diff_line_count(file_path)
+            if changed_lines is not None and changed_lines <= INCREMENTAL_KEEP_LINES:
+                return None, None
+            if changed_lines is not None and changed_lines <= INCREMENTAL_DIFF_LINES:
+                diff = get_file_diff(file_path)
+                if diff:
+                    summary, backend = summarize_diff(file_path, previous_summary, diff)
+                    if summary:
+                        return summary, backend
+    
+    return summarize_file(file_path)
 
 def update_index_md(directory, file_name, summary):
     """백업 및 검증과 함께 index.md 파일을 안전하게 업데이트합니다."""
     index_path = os.path.join(directory, 'index.md')
     backup_path = None
     
-    try:
-        # 기존 파일이 있으면 백업 생성
-        if os.path.exists(index_path):
-            backup_path = create_backup(index_path)
-        
-        entry = f"- `{file_name}`: {summary}"
-        file_list_header = "## 주요 파일"
-        
-        if not os.path.exists(index_path):
-            print(f"'{index_path}' 생성 중...")
-            folder_name = os.path.basename(directory) if directory else "Root"
-            content = f"# {folder_name}\n\n이 폴더의 역할을 설명해주세요.\n\n{file_list_header}\n{entry}\n"
-            with open(index_path, 'w', encoding='utf-8') as f:
-                f.write(content)
-        else:
-            print(f"'{index_path}' 업데이트 중...")
-            with open(index_path, 'r', encoding='utf-8') as f:
-                lines = f.readlines()
+    with index_lock(directory):
+        try:
+            # 기존 파일이 있으면 백업 생성
+            if os.path.exists(index_path):
+                backup_path = create_backup(index_path)
             
-            updated = False
-            for i, line in enumerate(lines):
-                if line.strip().startswith(f'- `{file_name}`'):
-                    lines[i] = entry + '\n'
-                    updated = True
-                    break
+            entry = f"- `{file_name}`: {summary}"
+            file_list_header = "## 주요 파일"
             
-            if not updated:
-                try:
-                    header_index = [i for i, line in enumerate(lines) if line.strip() == file_list_header][0]
-                    lines.insert(header_index + 1, entry + '\n')
-                except IndexError:
-                    lines.append(f"\n{file_list_header}\n")
-                    lines.append(entry + '\n')
+            if not os.path.exists(index_path):
+                print(f"'{index_path}' 생성 중...")
+                folder_name = os.path.basename(directory) if directory else "Root"
+                content = f"# {folder_name}\n\n이 폴더의 역할을 설명해주세요.\n\n{file_list_header}\n{entry}\n"
+                atomic_write(index_path, content)
+            else:
+                print(f"'{index_path}' 업데이트 중...")
+                with open(index_path, 'r', encoding='utf-8') as f:
+                    lines = f.readlines()
+                
+                updated = False
+                for i, line in enumerate(lines):
+                    if line.strip().startswith(f'- `{file_name}`'):
+                        lines[i] = entry + '\n'
+                        updated = True
+                        break
+                
+                if not updated:
+                    try:
+                        header_index = [i for i, line in enumerate(lines) if line.strip() == file_list_header][0]
+                        lines.insert(header_index + 1, entry + '\n')
+                    except IndexError:
+                        lines.append(f"\n{file_list_header}\n")
+                        lines.append(entry + '\n')
+                
+                atomic_write(index_path, ''.join(lines))
             
-            with open(index_path, 'w', encoding='utf-8') as f:
-                f.writelines(lines)
-        
-        # 업데이트 후 검증
-        if not validate_index_md(index_path):
-            print(f"검증 실패: {index_path}", file=sys.stderr)
+            # 업데이트 후 검증
+            if not validate_index_md(index_path):
+                print(f"검증 실패: {index_path}", file=sys.stderr)
+                if backup_path:
+                    restore_backup(index_path, backup_path)
+                return False
+            
+            return True
+            
+        except Exception as e:
+            print(f"index.md 업데이트 중 오류 발생: {e}", file=sys.stderr)
             if backup_path:
                 restore_backup(index_path, backup_path)
             return False
-        
-        return True
-        
-    except Exception as e:
-        print(f"index.md 업데이트 중 오류 발생: {e}", file=sys.stderr)
-        if backup_path:
-            restore_backup(index_path, backup_path)
-        return False
 
 
 def remove_entry_from_index_md(directory, file_name):
@@ -220,38 +733,38 @@ def remove_entry_from_index_md(directory, file_name):
     if not os.path.exists(index_path):
         return True
 
-    backup_path = create_backup(index_path)
-    
-    try:
-        print(f"'{index_path}'에서 '{file_name}' 항목 삭제 중...")
-        with open(index_path, 'r', encoding='utf-8') as f:
-            lines = f.readlines()
+    with index_lock(directory):
+        backup_path = create_backup(index_path)
+        
+        try:
+            print(f"'{index_path}'에서 '{file_name}' 항목 삭제 중...")
+            with open(index_path, 'r', encoding='utf-8') as f:
+                lines = f.readlines()
 
-        # 삭제할 라인을 제외한 나머지 라인만 필터링
-        lines_to_keep = [line for line in lines if not line.strip().startswith(f'- `{file_name}`')]
+            # 삭제할 라인을 제외한 나머지 라인만 필터링
+            lines_to_keep = [line for line in lines if not line.strip().startswith(f'- `{file_name}`')]
 
-        if len(lines) != len(lines_to_keep):
-            with open(index_path, 'w', encoding='utf-8') as f:
-                f.writelines(lines_to_keep)
-            
-            # 삭제 후 검증
-            if not validate_index_md(index_path):
-                print(f"삭제 후 검증 실패: {index_path}", file=sys.stderr)
-                if backup_path:
-                    restore_backup(index_path, backup_path)
-                return False
-            
-            print(f"항목 삭제 완료.")
-            return True
-        else:
-            print(f"삭제할 항목을 찾지 못했습니다.")
-            return True
-            
-    except Exception as e:
-        print(f"항목 삭제 중 오류 발생: {e}", file=sys.stderr)
-        if backup_path:
-            restore_backup(index_path, backup_path)
-        return False
+            if len(lines) != len(lines_to_keep):
+                atomic_write(index_path, ''.join(lines_to_keep))
+                
+                # 삭제 후 검증
+                if not validate_index_md(index_path):
+                    print(f"삭제 후 검증 실패: {index_path}", file=sys.stderr)
+                    if backup_path:
+                        restore_backup(index_path, backup_path)
+                    return False
+                
+                print(f"항목 삭제 완료.")
+                return True
+            else:
+                print(f"삭제할 항목을 찾지 못했습니다.")
+                return True
+                
+        except Exception as e:
+            print(f"항목 삭제 중 오류 발생: {e}", file=sys.stderr)
+            if backup_path:
+                restore_backup(index_path, backup_path)
+            return False
 
 
 def is_protected_directory(directory):
@@ -277,8 +790,43 @@ def check_index_md_modifications():
     except subprocess.CalledProcessError:
         return False
 
-def main():
+def should_skip_file(file_path):
+    """스크립트 자신이나 index.md 파일, 사이드카 인덱스, 보호된 디렉토리의 변경인지 확인합니다."""
+    return (file_path.endswith('update_index_md.py') or
+            file_path.endswith('index.md') or
+            os.path.basename(file_path).startswith(index_sidecar.SIDECAR_FILE) or
+            is_protected_directory(file_path))
+
+def open_sidecar_index():
+    """저장소 루트의 사이드카 인덱스를 엽니다. 실패해도 hook은 계속 진행합니다."""
+    try:
+        return index_sidecar.open_index(index_sidecar.SIDECAR_FILE)
+    except sqlite3.Error as e:
+        print(f"경고: 사이드카 인덱스를 열 수 없습니다: {e}", file=sys.stderr)
+        return None
+
+def update_sidecar_index(conn, status, file_path, summary=None, blob_sha=None, backend=None):
+    """index.md 변경 내용을 사이드카 인덱스에 반영합니다. (삭제 시 항목 제거)"""
+    if conn is None:
+        return
+    try:
+        if status == 'D':
+            index_sidecar.remove_entry(conn, file_path)
+        elif summary is not None:
+            index_sidecar.upsert_entry(conn, file_path, summary, blob_sha, backend)
+    except sqlite3.Error as e:
+        print(f"경고: 사이드카 인덱스 갱신 실패 ({file_path}): {e}", file=sys.stderr)
+
+def run_hook(executor=None):
+    """변경된 파일들의 index.md를 갱신하고 종료 코드를 반환합니다.
+
+    executor가 주어지면 (데몬 모드) 파일 요약을 미리 병렬로 생성합니다.
+    index.md 쓰기는 항상 순차적으로 수행됩니다.
+    """
+    global _claude_cli_available
     print("--- index.md 업데이트 Hook 시작 (v4: Claude CLI 통합) ---")
+    # 데몬은 프로세스가 계속 살아 있으므로 Claude CLI 설치 여부를 실행마다 다시 확인
+    _claude_cli_available = None
     
     # index.md 직접 수정 검사
     if check_index_md_modifications():
@@ -288,16 +836,40 @@ def main():
 
     if not changes:
         print("변경사항이 없어 Hook을 종료합니다.")
-        sys.exit(0)
+        return 0
+
+    run_lock_path = get_run_lock_path()
+    run_token = None
+    if run_lock_path:
+        run_token = acquire_run_lock(run_lock_path)
+        if run_token is None:
+            print("다른 index.md Hook 실행이 끝나지 않아 중단합니다.", file=sys.stderr)
+            return 1
+    
+    try:
+        return process_changes(changes, executor, run_lock_path, run_token)
+    finally:
+        if run_lock_path:
+            release_run_lock(run_lock_path, run_token)
+
+def process_changes(changes, executor, run_lock_path, run_token):
+    """변경 목록을 index.md에 반영합니다. 더 새로운 실행이 잠금을 가져가면 남은 작업을 중단합니다."""
+    # 데몬 모드: 요약을 스레드 풀에서 미리 생성
+    summaries = {}
+    if executor is not None:
+        targets = [(status, file_path) for status, file_path in changes
+                   if status in ('A', 'M') and not should_skip_file(file_path)]
+        summaries = {file_path: executor.submit(summarize_changed_file, status, file_path)
+                     for status, file_path in targets}
 
     updated_indices = set()
     failed_operations = []
+    sidecar = open_sidecar_index()
+    blob_shas = index_sidecar.get_blob_shas([file_path for status, file_path in changes
+                                             if status in ('A', 'M') and not should_skip_file(file_path)])
 
-    for status, file_path in changes:
-        # 스크립트 자신이나 index.md 파일, 보호된 디렉토리의 변경은 무시
-        if (file_path.endswith('update_index_md.py') or 
-            file_path.endswith('index.md') or 
-            is_protected_directory(file_path)):
+    for index, (status, file_path) in enumerate(changes):
+        if should_skip_file(file_path):
             continue
         
         directory = os.path.dirname(file_path)
@@ -305,10 +877,33 @@ def main():
         
         print(f"\n> 상태: {status}, 파일: {file_path}")
 
+        summary = backend = None
+        if status == 'A' or status == 'M':
+            # 파일 추가 또는 수정 시 요약 생성
+            if file_path in summaries:
+                summary, backend = summaries[file_path].result()
+            else:
+                summary, backend = summarize_changed_file(status, file_path)
+        
+        # 요약하는 동안 더 새로운 실행이 잠금을 가져갔다면 index.md를 수정하지 않고 중단
+        if run_lock_path and not refresh_run_lock(run_lock_path, run_token):
+            print("더 새로운 Hook 실행이 잠금을 가져가 남은 작업을 중단합니다.", file=sys.stderr)
+            for future in summaries.values():
+                future.cancel()
+            failed_operations.extend(change for change in changes[index:]
+                                     if not should_skip_file(change[1]))
+            break
+
         success = False
         if status == 'A' or status == 'M':
-            # 파일 추가 또는 수정 시 요약 후 업데이트
-            summary = summarize_file_with_claude(file_path)
+            if summary is None:
+                # 작은 수정은 기존 요약을 그대로 유지
+                print(f"변경이 작아 '{file_name}'의 기존 요약을 유지합니다.")
+                update_sidecar_index(sidecar, status, file_path, get_index_entry(directory, file_name),
+                                     blob_shas.get(file_path))
+                continue
+            if backend:
+                print(f"요약 백엔드: {backend}")
             success = update_index_md(directory, file_name, summary)
             
         elif status == 'D':
@@ -317,9 +912,13 @@ def main():
         
         if success:
             updated_indices.add(os.path.join(directory, 'index.md'))
+            update_sidecar_index(sidecar, status, file_path, summary, blob_shas.get(file_path), backend)
         else:
             failed_operations.append((status, file_path))
 
+    if sidecar is not None:
+        sidecar.close()
+
     print("\n--- index.md 업데이트 완료 ---")
     
     if failed_operations:
@@ -327,14 +926,17 @@ def main():
         for status, file_path in failed_operations:
             print(f"- {status}: {file_path}", file=sys.stderr)
         print("Hook이 실패했습니다. 커밋이 중단됩니다.", file=sys.stderr)
-        sys.exit(1)
+        return 1
     
     if updated_indices:
         print("성공적으로 업데이트된 index.md 파일:")
         for path in sorted([p for p in updated_indices if p]):
             print(f"- {path}")
     
-    sys.exit(0)
+    return 0
+
+def main():
+    sys.exit(run_hook())
 
 
 if __name__ == "__main__":
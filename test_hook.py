@@ -8,8 +8,19 @@ import os
 import sys
 import tempfile
 import shutil
+import json
+import time
+import subprocess
+import threading
+import http.server
 from datetime import datetime
 
+SCRIPTS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "hooks", "scripts")
+sys.path.insert(0, SCRIPTS_DIR)
+
+import update_index_md
+import index_sidecar
+
 # 테스트용 모의 함수들
 class MockAnthropicClient:
     def messages(self):
@@ -141,6 +152,407 @@ def test_error_handling():
     
     simulate_api_call_with_retry()
 
+def test_incremental_summary():
+    """수정 파일 증분 요약 테스트 (Claude CLI 호출 없음, 백엔드 스텁 사용)"""
+    print("\n=== 증분 요약 테스트 ===")
+    
+    with tempfile.TemporaryDirectory() as temp_dir:
+        def git(*args):
+            subprocess.run(["git", "-c", "user.name=test", "-c", "user.email=test@example.com", *args],
+                           cwd=temp_dir, check=True, capture_output=True)
+        
+        file_path = os.path.join(temp_dir, "module.py")
+        with open(file_path, 'w') as f:
+            f.write("".join(f"line_{i} = {i}\n" for i in range(20)))
+        calc_path = os.path.join(temp_dir, "calc.py")
+        with open(calc_path, 'w') as f:
+            f.write('"""Calculator module."""\n')
+        with open(os.path.join(temp_dir, "index.md"), 'w') as f:
+            f.write("# 테스트\n\n## 주요 파일\n- `module.py`: 기존 요약\n- `calc.py`: Calculator module.\n")
+        git("init", "-q")
+        git("add", ".")
+        git("commit", "-qm", "init")
+        
+        with open(file_path, 'a') as f:
+            f.write("line_20 = 20\n")
+        with open(calc_path, 'w') as f:
+            f.write('"""Parser module."""\n')
+        git("commit", "-qam", "small change")
+        
+        previous_cwd = os.getcwd()
+        os.chdir(temp_dir)
+        try:
+            assert update_index_md.get_index_entry("", "module.py") == "기존 요약"
+            print("✓ 기존 요약 읽기")
+            assert update_index_md.get_diff_line_count("module.py") == 1
+            assert "+line_20 = 20" in update_index_md.get_file_diff("module.py")
+            print("✓ diff 크기 및 본문 계산")
+            assert update_index_md.summarize_changed_file("M", "module.py") == (None, None)
+            print("✓ 작은 수정은 기존 요약 유지")
+            # 로컬 요약이 먼저인 파일(작은 파일)은 작은 수정이어도 다시 요약
+            assert update_index_md.summarize_changed_file("M", "calc.py") == ("Parser module.", 'local')
+            print("✓ 로컬 요약 파일은 항상 다시 요약")
+            
+            with open(file_path, 'a') as f:
+                f.write("".join(f"added_{i} = {i}\n" for i in range(10)))
+            git("commit", "-qam", "medium change")
+            
+            # Claude CLI 대신 프롬프트를 기록하는 스텁 사용 (diff 프롬프트에는 None 반환 가능)
+            prompts = []
+            diff_result = ["diff 반영 요약"]
+            def stub_backend(file_path, prompt, content):
+                prompts.append(prompt)
+                return diff_result[0] if "--- 변경 내용 ---" in prompt else "전체 파일 요약"
+            
+            original_backend = update_index_md.SUMMARIZER_BACKENDS['claude-cli']
+            update_index_md.SUMMARIZER_BACKENDS['claude-cli'] = stub_backend
+            os.environ['SUMMARIZER_CONFIG_PATH'] = os.path.join(temp_dir, "missing.json")
+            try:
+                result = update_index_md.summarize_changed_file("M", "module.py")
+                assert result == ("diff 반영 요약", 'claude-cli'), result
+                assert len(prompts) == 1
+                assert "기존 요약: 기존 요약" in prompts[0]
+                assert "+added_9 = 9" in prompts[0]
+                assert "line_0 = 0" not in prompts[0] and "--- 파일 내용 ---" not in prompts[0]
+                print("✓ 중간 크기 수정은 기존 요약 + diff로 갱신")
+                
+                prompts.clear()
+                diff_result[0] = None
+                result = update_index_md.summarize_changed_file("M", "module.py")
+                assert result == ("전체 파일 요약", 'claude-cli'), result
+                assert len(prompts) == 2 and "--- 파일 내용 ---" in prompts[1]
+                print("✓ diff 요약 실패 시 전체 파일 요약으로 대체")
+                
+                # 예시 설정의 ".md": ["local", "claude-cli"]처럼 로컬이 먼저인 파일은 diff 프롬프트 생략
+                with open(os.path.join(temp_dir, "guide.md"), 'w') as f:
+                    f.write("# 가이드\n\n" + "설명 문장입니다.\n" * 30)
+                os.environ['SUMMARIZER_CONFIG_PATH'] = os.path.join(
+                    os.path.dirname(SCRIPTS_DIR), "configs", "summarizer.example.json")
+                prompts.clear()
+                assert update_index_md.summarize_diff("guide.md", "기존 요약", "@@ -1 +1 @@") == (None, None)
+                assert prompts == []
+                print("✓ 로컬 우선 파일은 diff 프롬프트로 모델을 호출하지 않음")
+            finally:
+                update_index_md.SUMMARIZER_BACKENDS['claude-cli'] = original_backend
+                os.environ.pop('SUMMARIZER_CONFIG_PATH', None)
+        finally:
+            os.chdir(previous_cwd)
+
+def test_local_summarizer():
+    """로컬 휴리스틱 요약 백엔드 테스트"""
+    print("\n=== 로컬 요약 백엔드 테스트 ===")
+    
+    summarize = update_index_md.summarize_with_local_heuristic
+    test_cases = [
+        ("calc.py", '"""간단한 계산기 모듈\n\n사칙연산을 제공합니다."""\n', "간단한 계산기 모듈"),
+        ("deploy.sh", "#!/bin/bash\n# 스테이징 배포 스크립트\nset -e\n", "스테이징 배포 스크립트"),
+        ("guide.md", "# 설치 가이드\n\n설치 방법을 설명합니다.\n", "설치 가이드: 설치 방법을 설명합니다."),
+        ("package.json", '{"name": "demo", "description": "데모 패키지"}', "demo: 데모 패키지"),
+        ("data.json", '{"a": 1}\n', "JSON 설정 파일 (1줄)"),
+        ("post.md", "---\ntitle: 글 제목\ndate: 2024-01-01\n---\n\n# 블로그 글\n\n첫 문단입니다.\n", "블로그 글: 첫 문단입니다."),
+        ("main.c", "/* 프로그램 진입점 */\n#include <stdio.h>\n", "프로그램 진입점"),
+        ("util.c", "#include <stdio.h>\n\nint x;\n", "C 파일 (3줄)"),
+        ("types.inc", "#pragma once\n#define MAX 10\n", "INC 파일 (2줄)"),
+        ("query.sql", "-- 사용자 목록 조회\nSELECT * FROM users;\n", "사용자 목록 조회"),
+    ]
+    
+    for file_name, content, expected in test_cases:
+        result = summarize(file_name, None, content)
+        assert result == expected, f"{file_name}: {result}"
+        print(f"✓ {file_name}: {result}")
+    
+    # 작은 파일은 로컬 요약만 사용
+    assert update_index_md.get_backend_chain("small.py", 10) == ["local"]
+    print("✓ 작은 파일은 모델 호출 없이 로컬 요약")
+
+def test_summarizer_backends():
+    """요약 백엔드 설정 및 백엔드 순서 테스트"""
+    print("\n=== 요약 백엔드 설정 테스트 ===")
+    
+    previous_path = os.environ.get('SUMMARIZER_CONFIG_PATH')
+    with tempfile.TemporaryDirectory() as temp_dir:
+        config_path = os.path.join(temp_dir, "summarizer.json")
+        os.environ['SUMMARIZER_CONFIG_PATH'] = config_path
+        try:
+            with open(config_path, 'w') as f:
+                json.dump({"trivial_file_size": 10}, f)
+            assert update_index_md.load_summarizer_config()['trivial_file_size'] == 10
+            
+            with open(config_path, 'w') as f:
+                json.dump({"trivial_file_size": 20}, f)
+            os.utime(config_path, ns=(0, 0))
+            assert update_index_md.load_summarizer_config()['trivial_file_size'] == 20
+            print("✓ 설정 파일 변경 시 다시 읽기")
+            
+            with open(config_path, 'w') as f:
+                json.dump(["local"], f)
+            assert update_index_md.load_summarizer_config() == update_index_md.DEFAULT_SUMMARIZER_CONFIG
+            print("✓ JSON 객체가 아닌 설정은 무시")
+            
+            # 형식이 잘못된 항목만 기본값으로 대체하고 나머지는 유지
+            with open(config_path, 'w') as f:
+                json.dump({"trivial_file_size": "200", "backends_by_extension": [], "default_backends": "local",
+                           "http": {"url": 1}, "unknown": True}, f)
+            os.utime(config_path, ns=(1, 1))  # 같은 시각에 연속으로 쓴 경우에도 다시 읽도록 mtime 변경
+            config = update_index_md.load_summarizer_config()
+            assert config == dict(update_index_md.DEFAULT_SUMMARIZER_CONFIG, unknown=True), config
+            assert update_index_md.get_backend_chain("big.py", 1000) == ["claude-cli", "http", "local"]
+            with open(config_path, 'w') as f:
+                json.dump({"trivial_file_size": 10, "backends_by_extension": {".md": "local"}}, f)
+            os.utime(config_path, ns=(2, 2))
+            config = update_index_md.load_summarizer_config()
+            assert config['trivial_file_size'] == 10 and config['backends_by_extension'] == {}
+            print("✓ 형식이 잘못된 설정 항목은 기본값 사용")
+            
+            # HTTP 백엔드: 로컬 스텁 서버의 응답을 순서대로 반환
+            responses = []
+            class StubHandler(http.server.BaseHTTPRequestHandler):
+                def do_POST(self):
+                    self.rfile.read(int(self.headers['Content-Length']))
+                    body = responses.pop(0).encode('utf-8')
+                    self.send_response(200)
+                    self.send_header('Content-Length', str(len(body)))
+                    self.end_headers()
+                    self.wfile.write(body)
+                
+                def log_message(self, *args):
+                    pass
+            
+            server = http.server.HTTPServer(('127.0.0.1', 0), StubHandler)
+            threading.Thread(target=server.serve_forever, daemon=True).start()
+            try:
+                with open(config_path, 'w') as f:
+                    json.dump({"http": {"url": f"http://127.0.0.1:{server.server_port}/", "timeout": 5}}, f)
+                
+                responses[:] = ['{"summary": "HTTP 요약\\n둘째 줄"}', '일반 텍스트 요약', '{"summary": null}', '{"summary": 3}']
+                summarize_http = update_index_md.summarize_with_http
+                assert summarize_http("a.py", "prompt", "") == "HTTP 요약"
+                assert summarize_http("a.py", "prompt", "") == "일반 텍스트 요약"
+                assert summarize_http("a.py", "prompt", "") is None
+                assert summarize_http("a.py", "prompt", "") is None
+                print("✓ HTTP 백엔드 응답 처리 (문자열이 아닌 요약은 실패)")
+                
+                # 실패한 백엔드는 건너뛰고 다음 백엔드 사용
+                calls = []
+                def failing_backend(file_path, prompt, content):
+                    calls.append('fail')
+                    return None
+                update_index_md.SUMMARIZER_BACKENDS['fail'] = failing_backend
+                chain = ['fail', 'http', 'local']
+                content = "# 로컬 요약\nx = 1\n"
+                
+                responses[:] = ['{"summary": "HTTP 요약"}']
+                assert update_index_md.run_backends("a.sh", chain, "prompt", content) == ("HTTP 요약", 'http')
+                responses[:] = ['{"summary": null}']
+                assert update_index_md.run_backends("a.sh", chain, "prompt", content) == ("로컬 요약", 'local')
+                assert calls == ['fail', 'fail'] and not responses
+                print("✓ 백엔드 순서대로 대체 (fail → http → local)")
+            finally:
+                update_index_md.SUMMARIZER_BACKENDS.pop('fail', None)
+                server.shutdown()
+                server.server_close()
+        finally:
+            if previous_path is None:
+                os.environ.pop('SUMMARIZER_CONFIG_PATH', None)
+            else:
+                os.environ['SUMMARIZER_CONFIG_PATH'] = previous_path
+
+def test_locking():
+    """index.md 원자적 쓰기 및 실행 잠금 테스트"""
+    print("\n=== 잠금 및 원자적 쓰기 테스트 ===")
+    
+    with tempfile.TemporaryDirectory() as temp_dir:
+        index_path = os.path.join(temp_dir, "index.md")
+        with update_index_md.index_lock(temp_dir):
+            update_index_md.atomic_write(index_path, "# 테스트\n\n## 주요 파일\n")
+        with open(index_path, 'r', encoding='utf-8') as f:
+            assert f.read() == "# 테스트\n\n## 주요 파일\n"
+        assert not [name for name in os.listdir(temp_dir) if name.endswith('.tmp')]
+        print("✓ 원자적 쓰기 (임시 파일 없음)")
+        
+        lock_path = os.path.join(temp_dir, "run.lock")
+        first = update_index_md.acquire_run_lock(lock_path)
+        assert update_index_md.refresh_run_lock(lock_path, first)
+        print("✓ 실행 잠금 획득 및 heartbeat 갱신")
+        
+        # 진행이 멈춘 실행은 새 실행이 대체하고, 이전 실행은 잠금을 잃음
+        with open(lock_path, 'r', encoding='utf-8') as f:
+            owner = json.load(f)
+        owner['heartbeat'] -= update_index_md.RUN_LOCK_STALE_SECONDS + 1
+        with open(lock_path, 'w', encoding='utf-8') as f:
+            json.dump(owner, f)
+        second = update_index_md.acquire_run_lock(lock_path)
+        assert second != first
+        assert not update_index_md.refresh_run_lock(lock_path, first)
+        print("✓ stale 실행을 새 실행이 대체")
+        
+        update_index_md.release_run_lock(lock_path, first)
+        assert update_index_md.refresh_run_lock(lock_path, second)
+        update_index_md.release_run_lock(lock_path, second)
+        assert os.path.getsize(lock_path) == 0
+        print("✓ 소유자만 잠금 해제")
+
+def test_sidecar_index():
+    """사이드카 인덱스 갱신 및 조회 테스트"""
+    print("\n=== 사이드카 인덱스 테스트 ===")
+    
+    with tempfile.TemporaryDirectory() as temp_dir:
+        conn = index_sidecar.open_index(os.path.join(temp_dir, index_sidecar.SIDECAR_FILE))
+        index_sidecar.upsert_entry(conn, "src/calc.py", "사칙연산을 제공하는 계산기 모듈", "abc123", "local")
+        index_sidecar.upsert_entry(conn, "src/io.py", "파일 입출력 도우미")
+        index_sidecar.upsert_entry(conn, "README.md", "프로젝트 소개 문서")
+        
+        entry = index_sidecar.get_entry(conn, "src/calc.py")
+        assert entry["blob_sha"] == "abc123" and entry["backend"] == "local"
+        print("✓ 경로 조회")
+        
+        # backend를 지정하지 않은 갱신은 기존 backend를 유지
+        index_sidecar.upsert_entry(conn, "src/calc.py", "계산기 모듈")
+        assert index_sidecar.get_entry(conn, "src/calc.py")["backend"] == "local"
+        print("✓ 증분 갱신")
+        
+        assert [e["path"] for e in index_sidecar.find_by_prefix(conn, "src/")] == ["src/calc.py", "src/io.py"]
+        index_sidecar.upsert_entry(conn, "docs/\U0001F680.md", "로켓 문서")
+        assert [e["path"] for e in index_sidecar.find_by_prefix(conn, "docs/")] == ["docs/\U0001F680.md"]
+        index_sidecar.remove_entry(conn, "docs/\U0001F680.md")
+        print("✓ 접두사 조회 (BMP 밖의 문자 포함)")
+        
+        assert [e["path"] for e in index_sidecar.search(conn, "입출력 도우미")] == ["src/io.py"]
+        assert [e["path"] for e in index_sidecar.search(conn, "소개")] == ["README.md"]
+        print("✓ 전문 검색")
+        
+        index_sidecar.remove_entry(conn, "src/io.py")
+        assert index_sidecar.get_entry(conn, "src/io.py") is None
+        print("✓ 항목 삭제")
+        
+        os.makedirs(os.path.join(temp_dir, "docs"))
+        with open(os.path.join(temp_dir, "docs", "index.md"), 'w', encoding='utf-8') as f:
+            f.write("# docs\n\n## 주요 파일\n- `guide.md`: 설치 가이드\n")
+        assert index_sidecar.rebuild_index(conn, temp_dir) == 1
+        assert index_sidecar.get_entry(conn, "docs/guide.md")["summary"] == "설치 가이드"
+        print("✓ index.md에서 재생성")
+        conn.close()
+
+def test_github_session():
+    """데몬 GitHub 연결 재시도 테스트 (로컬 스텁 서버 사용)"""
+    print("\n=== GitHub 연결 재시도 테스트 ===")
+    
+    import hook_daemon
+    
+    requests = []
+    class StubHandler(http.server.BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+        
+        def do_POST(self):
+            self.rfile.read(int(self.headers['Content-Length']))
+            requests.append(self.path)
+            if self.path.endswith('/slow'):
+                time.sleep(0.5)
+            body = b'{"number": 1}'
+            try:
+                self.send_response(201)
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+            except BrokenPipeError:
+                pass  # 타임아웃으로 클라이언트가 먼저 연결을 닫은 경우
+            # Connection: close 없이 연결을 닫아 서버가 keep-alive 연결을 정리한 상황을 재현
+            self.close_connection = self.path.endswith('/stale')
+        
+        def log_message(self, *args):
+            pass
+    
+    server = http.server.ThreadingHTTPServer(('127.0.0.1', 0), StubHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    base_url = f"http://127.0.0.1:{server.server_port}"
+    previous_timeout = hook_daemon.GITHUB_TIMEOUT
+    session = hook_daemon.GitHubSession()
+    try:
+        assert session.request('POST', '/stale', 'token', base_url, {}) == (201, {"number": 1})
+        assert session.request('POST', '/issues', 'token', base_url, {}) == (201, {"number": 1})
+        assert requests == ['/stale', '/issues']
+        print("✓ 닫힌 keep-alive 연결은 재연결 후 한 번만 전송")
+        
+        session.close()
+        requests.clear()
+        hook_daemon.GITHUB_TIMEOUT = 0.1
+        try:
+            session.request('POST', '/slow', 'token', base_url, {})
+            assert False, "타임아웃이 발생해야 합니다"
+        except OSError:
+            pass
+        time.sleep(0.6)
+        assert requests == ['/slow']
+        print("✓ 응답 타임아웃 시 POST를 다시 보내지 않음")
+    finally:
+        hook_daemon.GITHUB_TIMEOUT = previous_timeout
+        session.close()
+        server.shutdown()
+        server.server_close()
+
+def test_daemon_roundtrip():
+    """데몬 모드 클라이언트/서버 왕복 테스트"""
+    print("\n=== 데몬 모드 테스트 ===")
+    
+    with tempfile.TemporaryDirectory() as temp_dir:
+        env = dict(os.environ)
+        env["AGENT_HOOK_SOCKET"] = os.path.join(temp_dir, "hook.sock")
+        client = [sys.executable, os.path.join(SCRIPTS_DIR, "hook_client.py")]
+        
+        hook_data = {"tool_name": "TodoWrite",
+                     "tool_input": {"todos": [{"id": "1", "content": "테스트", "status": "pending"}]}}
+        try:
+            # 첫 호출은 데몬을 자동 시작하고, 두 번째 호출은 실행 중인 데몬을 재사용
+            # 호출마다 다른 LOG_FILE을 주어 데몬이 요청별 환경 변수를 사용하는지 확인
+            for attempt in range(2):
+                env["LOG_FILE"] = os.path.join(temp_dir, f"hook{attempt}.log")
+                result = subprocess.run(client + ["todo-to-project"], input=json.dumps(hook_data),
+                                        capture_output=True, text=True, env=env, timeout=30)
+                assert result.returncode == 0, result.stderr
+                assert json.loads(result.stdout.splitlines()[-2]) == {"success": True, "processed": True}
+                assert os.path.exists(env["LOG_FILE"])
+                print(f"✓ 데몬 응답 수신 ({attempt + 1}회차)")
+            
+            # 데몬과 .sh 스크립트의 종료 코드와 stdout(시각 제외)이 같은지 확인
+            def without_timestamps(text):
+                return [line.split('] ', 1)[-1] for line in text.splitlines()]
+            
+            bad_todo = dict(hook_data, tool_input={"todos": ["문자열 항목"]})
+            cases = [("todo-to-project", hook_data), ("todo-to-project", bad_todo),
+                     ("todo-to-project", {"tool_name": "Read"}), ("plan-to-issue", {"prompt": "안녕하세요"})]
+            for event, data in cases:
+                script = os.path.join(SCRIPTS_DIR, f"{event}.sh")
+                daemon_result = subprocess.run(client + [event], input=json.dumps(data),
+                                               capture_output=True, text=True, env=env, timeout=30)
+                script_result = subprocess.run(["bash", script], input=json.dumps(data),
+                                               capture_output=True, text=True, env=env, timeout=30)
+                assert daemon_result.returncode == script_result.returncode == 0
+                assert without_timestamps(daemon_result.stdout) == without_timestamps(script_result.stdout), \
+                    (daemon_result.stdout, script_result.stdout)
+            print("✓ 데몬과 스크립트의 출력 일치")
+            
+            assert not os.stat(env["AGENT_HOOK_SOCKET"]).st_mode & 0o077
+            print("✓ 소켓은 소유자만 접근 가능")
+            
+            result = subprocess.run(client + ["unknown-event"], input="",
+                                    capture_output=True, text=True, env=env, timeout=30)
+            assert result.returncode != 0
+            print("✓ 알 수 없는 이벤트 거부됨")
+        finally:
+            subprocess.run(client + ["shutdown"], env=env, timeout=30)
+        
+        # 다른 사용자가 접근할 수 있는 디렉토리의 소켓은 사용하지 않고 스크립트를 직접 실행
+        shared_dir = os.path.join(temp_dir, "shared")
+        os.mkdir(shared_dir)
+        os.chmod(shared_dir, 0o777)
+        shared_env = dict(env, AGENT_HOOK_SOCKET=os.path.join(shared_dir, "hook.sock"))
+        result = subprocess.run(client + ["todo-to-project"], input=json.dumps(hook_data),
+                                capture_output=True, text=True, env=shared_env, timeout=30)
+        assert result.returncode == 0, result.stderr
+        assert "안전하게 사용할 수 없습니다" in result.stderr
+        assert os.listdir(shared_dir) == []
+        print("✓ 안전하지 않은 소켓 디렉토리는 사용하지 않음")
+
 def main():
     print("update_index_md.py 스크립트 검증 시작")
     print("=" * 50)
@@ -150,6 +562,13 @@ def main():
         test_validation_system()
         test_directory_protection()
         test_error_handling()
+        test_incremental_summary()
+        test_local_summarizer()
+        test_summarizer_backends()
+        test_locking()
+        test_sidecar_index()
+        test_github_session()
+        test_daemon_roundtrip()
         
         print("\n" + "=" * 50)
         print("✅ 모든 테스트 통과! 스크립트가 올바르게 작동할 것으로 예상됩니다.")
@@ -159,6 +578,11 @@ def main():
         print("3. ✅ 보호된 디렉토리 필터링")
         print("4. ✅ 에러 처리 및 재시도 로직")
         print("5. ✅ Hook 실패 시 커밋 중단")
+        print("6. ✅ 데몬 모드 클라이언트/서버 통신")
+        print("7. ✅ 수정 파일 증분 요약")
+        print("8. ✅ 요약 백엔드 선택 및 로컬 요약")
+        print("9. ✅ index.md 잠금 및 원자적 쓰기")
+        print("10. ✅ 사이드카 인덱스 조회")
         
         return True
         